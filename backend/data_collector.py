@@ -13,11 +13,11 @@ Production Strategy:
 import asyncio
 from datetime import datetime, timedelta
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from data_models import (
     PlayerSnapshot, ClanSnapshot, WarRecord, 
-    WarAttack, CWLRound, CapitalRaidSeason
+    WarAttack, CWLRound, CapitalRaidSeason, WAR_RESULT_CODES
 )
 from coc_api_client import CoCAPIClient
 import os
@@ -34,11 +34,17 @@ class DataCollector:
     This collector runs on schedule to build historical datasets.
     """
     
-    def __init__(self, db: AsyncIOMotorClient, api_key: str):
+    def __init__(self, db: AsyncIOMotorClient, api_key: str, redis_client=None):
         self.db = db
+        # Optional Redis client shared with the API; tag generations are also
+        # kept there so every process (and restart) sees the same counter
+        self.redis_client = redis_client
         self.api_key = api_key
         self.coc_client = CoCAPIClient(api_key)
         self.tracked_clans: List[str] = []  # Will be populated from DB or config
+        # Per clan/player tag counter, bumped whenever new data is stored for it
+        # (lets in-process result caches drop entries computed on older data)
+        self.data_generation: Dict[str, int] = {}
         
     async def initialize(self):
         """Initialize collector and load tracked entities."""
@@ -51,6 +57,15 @@ class DataCollector:
         
         logger.info(f"Data collector initialized. Tracking {len(self.tracked_clans)} clans.")
     
+    async def _mark_updated(self, tag: str):
+        """Record that new data was stored for a clan or player tag."""
+        self.data_generation[tag] = self.data_generation.get(tag, 0) + 1
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.incr(f"gen:{tag}")
+            except Exception as e:
+                logger.warning(f"Redis generation bump failed for {tag}: {e}")
+    
     async def add_clan_to_track(self, clan_tag: str):
         """
         Add a clan to tracking list.
@@ -100,6 +115,7 @@ class DataCollector:
             
             # Store in MongoDB
             await self.db.players_history.insert_one(snapshot.model_dump())
+            await self._mark_updated(player_tag)
             logger.debug(f"Collected snapshot for player {player_tag}")
             return snapshot
             
@@ -145,6 +161,7 @@ class DataCollector:
             # Collect snapshots for all members (in parallel)
             tasks = [self.collect_player_snapshot(tag) for tag in member_tags[:50]]  # Limit to avoid rate limit
             await asyncio.gather(*tasks, return_exceptions=True)
+            await self._mark_updated(clan_tag)
             
             logger.info(f"Collected snapshot for clan {clan_tag} with {len(member_tags)} members")
             return snapshot
@@ -174,9 +191,11 @@ class DataCollector:
                 if existing:
                     continue
                 
+                result = war.get('result', 'unknown')
                 record = WarRecord(
                     clan_tag=clan_tag,
-                    result=war.get('result', 'unknown'),
+                    result=result,
+                    result_code=WAR_RESULT_CODES.get(result, 0),
                     end_time=war.get('endTime', ''),
                     team_size=war.get('teamSize', 0),
                     clan_stars=war.get('clan', {}).get('stars', 0),
@@ -313,6 +332,7 @@ class DataCollector:
                 await self.collect_war_log(clan_tag)
                 await self.collect_current_war(clan_tag)
                 await self.collect_capital_raids(clan_tag)
+                await self._mark_updated(clan_tag)
                 
                 # Small delay between clans to respect rate limits
                 await asyncio.sleep(2)
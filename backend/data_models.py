@@ -12,6 +12,10 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 import uuid
 
+# Small-int encoding of war results, stored alongside the result string so
+# analyses can tabulate outcomes with integer arrays (np.bincount)
+WAR_RESULT_CODES = {'win': 1, 'tie': 0, 'lose': -1}
+
 
 class PlayerSnapshot(BaseModel):
     """
@@ -104,6 +108,7 @@ class WarRecord(BaseModel):
     
     # War metadata
     result: str  # win, lose, tie
+    result_code: int = 0  # WAR_RESULT_CODES[result]; 0 for tie/unknown
     end_time: str  # ISO format timestamp
     team_size: int
     
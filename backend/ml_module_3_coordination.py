@@ -23,8 +23,47 @@ from scipy.stats import entropy as scipy_entropy
 import warnings
 warnings.filterwarnings('ignore')
 
+from numba_compat import njit, NUMBA_AVAILABLE
+
 logger = logging.getLogger(__name__)
 
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+@njit(cache=True)
+def _timing_kernel(offsets_us, window_minutes):
+    """
+    Inter-attack intervals and coordination events of sorted attack times.
+    
+    Args:
+        offsets_us: Ascending int64 attack times, in microseconds since the first
+        window_minutes: Length of a coordination window
+    
+    Returns:
+        (intervals in minutes, number of attacks followed by 2+ attacks
+        within the window)
+    """
+    n = offsets_us.shape[0]
+    intervals = np.empty(n - 1)
+    for i in range(1, n):
+        intervals[i - 1] = (offsets_us[i] - offsets_us[i - 1]) / 1e6 / 60
+    
+    # Times are sorted, so each window's end only moves forward
+    events = 0
+    end = 0
+    for i in range(n):
+        if end <= i:
+            end = i + 1
+        while end < n and (offsets_us[end] - offsets_us[i]) / 1e6 / 60 <= window_minutes:
+            end += 1
+        if end - i - 1 >= 2:
+            events += 1
+    return intervals, events
+
+
+if NUMBA_AVAILABLE:
+    _timing_kernel(np.arange(3, dtype=np.int64), 5.0)
+
 
 class CoordinationModel:
     """
@@ -86,18 +125,17 @@ class CoordinationModel:
                 'interpretation': 'insufficient_timing_data'
             }
         
-        # Compute inter-attack intervals (in minutes)
-        intervals = []
-        for i in range(1, len(sorted_attacks)):
-            delta = (sorted_attacks[i]['attack_time'] - sorted_attacks[i-1]['attack_time'])
-            if isinstance(delta, timedelta):
-                minutes = delta.total_seconds() / 60
-            else:
-                minutes = 0
-            intervals.append(minutes)
+        # Inter-attack intervals (in minutes) and attacks opening a 5-min
+        # window with 2+ more attacks (3+ attacks in 5 min = coordinated)
+        first_time = sorted_attacks[0]['attack_time']
+        offsets_us = np.fromiter(
+            ((a['attack_time'] - first_time) // _ONE_MICROSECOND for a in sorted_attacks),
+            dtype=np.int64, count=len(sorted_attacks)
+        )
+        intervals, coordination_events = _timing_kernel(offsets_us, 5.0)
         
-        mean_interval = float(np.mean(intervals)) if intervals else 0
-        std_interval = float(np.std(intervals)) if intervals else 0
+        mean_interval = float(np.mean(intervals))
+        std_interval = float(np.std(intervals))
         
         # Clustering coefficient: high variance = clustered, low variance = uniform
         # Normalize by mean to get coefficient of variation
@@ -106,27 +144,7 @@ class CoordinationModel:
         else:
             clustering = 0
         
-        # Count coordination events (multiple attacks within 5-min window)
-        coordination_events = 0
-        window_minutes = 5
-        
-        for i, attack in enumerate(sorted_attacks):
-            # Count attacks within 5 minutes after this one
-            attacks_in_window = 0
-            for j in range(i+1, len(sorted_attacks)):
-                delta = (sorted_attacks[j]['attack_time'] - attack['attack_time'])
-                if isinstance(delta, timedelta):
-                    minutes = delta.total_seconds() / 60
-                else:
-                    break
-                
-                if minutes <= window_minutes:
-                    attacks_in_window += 1
-                else:
-                    break
-            
-            if attacks_in_window >= 2:  # 3+ attacks in 5-min window = coordinated
-                coordination_events += 1
+        coordination_events = int(coordination_events)
         
         # Interpretation
         if coordination_events >= len(sorted_attacks) * 0.3:
@@ -15,14 +15,223 @@ Demonstrates stochastic process modeling and financial mathematics applied to ga
 """
 
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Union
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from operator import itemgetter
 import logging
 from scipy import stats
 from scipy.optimize import minimize
 
+from numba_compat import njit
+
 logger = logging.getLogger(__name__)
 
+# Sort key for chronological ordering of snapshots
+_BY_SNAPSHOT_TIME = itemgetter('snapshot_time')
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+# One-sided z-score for the 5th/95th percentiles of a normal distribution
+_Z_95 = float(stats.norm.ppf(0.95))
+
+# Label lookups for the integer codes returned by the numeric kernels
+_CONFIDENCE_LEVELS = ('low', 'medium', 'high')
+_LUCK_INTERPRETATIONS = (
+    'performing_near_skill_level',
+    'currently_overperforming',
+    'currently_underperforming'
+)
+
+
+@njit(cache=True)
+def _trophy_moments(trophies):
+    """
+    Single-pass mean, std, min and max (Welford's algorithm).
+    
+    Returns:
+        (mean, std, min, max) with population std, matching np.std
+    """
+    n = trophies.shape[0]
+    mean = 0.0
+    m2 = 0.0
+    lo = trophies[0]
+    hi = trophies[0]
+    for i in range(n):
+        x = trophies[i]
+        delta = x - mean
+        mean += delta / (i + 1)
+        m2 += delta * (x - mean)
+        if x < lo:
+            lo = x
+        if x > hi:
+            hi = x
+    return mean, np.sqrt(m2 / n), lo, hi
+
+
+@njit(cache=True)
+def _return_volatility(trophies):
+    """
+    Std of percentage returns in one pass, without materializing the returns.
+    
+    Steps from a zero trophy count are skipped.
+    
+    Returns:
+        (std, number_of_returns)
+    """
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(1, trophies.shape[0]):
+        prev = trophies[i - 1]
+        if prev != 0:
+            ret = (trophies[i] - prev) / prev
+            count += 1
+            delta = ret - mean
+            mean += delta / count
+            m2 += delta * (ret - mean)
+    if count == 0:
+        return 0.0, 0
+    return np.sqrt(m2 / count), count
+
+
+def _simulate_ou_paths(current, mu, theta, sigma, dt, n_steps, n_simulations):
+    """
+    Simulate full OU trajectories, shape (n_simulations, n_steps + 1).
+    
+    Only used when per-day confidence bands are requested.
+    """
+    trajectories = np.empty((n_simulations, n_steps + 1))
+    trajectories[:, 0] = current
+    noise_scale = sigma * np.sqrt(dt)
+    
+    for t in range(n_steps):
+        # OU process: X_{t+1} = X_t + θ(μ - X_t)dt + σ√dt ε
+        dW = np.random.randn(n_simulations)
+        trajectories[:, t+1] = (
+            trajectories[:, t] +
+            theta * (mu - trajectories[:, t]) * dt +
+            noise_scale * dW
+        )
+    
+    return trajectories
+
+
+@njit(cache=True)
+def _momentum_kernel(y):
+    """
+    Least-squares slope against 0..n-1 plus up/down step counts, in one pass.
+    
+    Uses the closed form for evenly spaced x, so no design matrix is built.
+    
+    Returns:
+        (slope, positive_changes, negative_changes)
+    """
+    n = y.shape[0]
+    sum_y = 0.0
+    sum_xy = 0.0
+    pos = 0
+    neg = 0
+    for i in range(n):
+        sum_y += y[i]
+        sum_xy += i * y[i]
+        if i > 0:
+            d = y[i] - y[i - 1]
+            if d > 0:
+                pos += 1
+            elif d < 0:
+                neg += 1
+    den = n * (n * n - 1) / 12.0
+    slope = (sum_xy - (n - 1) / 2.0 * sum_y) / den
+    return slope, pos, neg
+
+
+@njit(cache=True)
+def _decompose_numeric(current, mu, sigma, n):
+    """
+    Numeric core of skill/luck decomposition.
+    
+    Returns:
+        (skill, luck, confidence_interval, conf_code, luck_code)
+        confidence_interval is -1.0 when it cannot be estimated.
+        conf_code indexes _CONFIDENCE_LEVELS, luck_code indexes _LUCK_INTERPRETATIONS.
+    """
+    # Skill estimate = equilibrium level (mu)
+    skill = mu
+    
+    # Luck contribution = current deviation from equilibrium
+    luck = current - mu
+    
+    # Confidence based on sample size and volatility
+    confidence_interval = -1.0
+    conf_code = 0
+    if n >= 30 and sigma > 0:
+        # 95% CI from standard error of mean
+        confidence_interval = 1.96 * sigma / np.sqrt(n)
+        
+        if confidence_interval < mu * 0.05:  # CI < 5% of estimate
+            conf_code = 2
+        elif confidence_interval < mu * 0.15:
+            conf_code = 1
+    
+    # Interpret luck
+    if luck > sigma:
+        luck_code = 1
+    elif luck < -sigma:
+        luck_code = 2
+    else:
+        luck_code = 0
+    
+    return skill, luck, confidence_interval, conf_code, luck_code
+
+
+@dataclass(slots=True)
+class TrophySeries:
+    """
+    Columnar (SoA) view of a player's snapshots, built once per report.
+    
+    `trophies` is float64 in snapshot order; `days` (days since the first
+    snapshot) is only filled when requested, since just the OU fit reads it.
+    `current` keeps the latest raw trophy count as stored.
+    """
+    trophies: np.ndarray
+    current: Any
+    days: Optional[np.ndarray] = None
+    
+    @classmethod
+    def from_snapshots(cls,
+                       snapshots: List[Dict[str, Any]],
+                       presorted: bool = True,
+                       with_days: bool = True) -> 'TrophySeries':
+        if not presorted:
+            snapshots = sorted(snapshots, key=_BY_SNAPSHOT_TIME)
+        n = len(snapshots)
+        trophies = np.fromiter((s['trophies'] for s in snapshots),
+                               dtype=np.float64, count=n)
+        days = None
+        if with_days and n:
+            first_time = snapshots[0]['snapshot_time']
+            offsets_us = np.fromiter(
+                ((s['snapshot_time'] - first_time) // _ONE_MICROSECOND for s in snapshots),
+                dtype=np.int64, count=n
+            )
+            days = offsets_us / 1e6 / 86400
+        return cls(trophies, snapshots[-1]['trophies'] if n else 0, days)
+    
+    def __len__(self) -> int:
+        return self.trophies.shape[0]
+
+
+SnapshotsOrSeries = Union[List[Dict[str, Any]], TrophySeries]
+
+
+def _as_series(snapshots: SnapshotsOrSeries,
+               presorted: bool = True,
+               with_days: bool = False) -> TrophySeries:
+    """Pass a TrophySeries through, or build one from snapshot dicts."""
+    if isinstance(snapshots, TrophySeries):
+        return snapshots
+    return TrophySeries.from_snapshots(snapshots, presorted=presorted, with_days=with_days)
+
 
 class TrophyVolatilityModel:
     """
@@ -49,7 +258,7 @@ class TrophyVolatilityModel:
         self.name = "trophy_volatility"
     
     def compute_trophy_statistics(self, 
-                                 snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+                                 snapshots: SnapshotsOrSeries) -> Dict[str, Any]:
         """
         Compute basic statistical properties of trophy trajectory.
         
@@ -68,19 +277,22 @@ class TrophyVolatilityModel:
                 'sample_size': 0
             }
         
-        trophies = [s['trophies'] for s in snapshots]
+        series = _as_series(snapshots)
+        trophies = series.trophies
+        mean, std, lo, hi = _trophy_moments(trophies)
         
         return {
-            'mean': float(np.mean(trophies)),
-            'std': float(np.std(trophies)),
-            'min': int(np.min(trophies)),
-            'max': int(np.max(trophies)),
-            'current': snapshots[-1]['trophies'],
+            'mean': float(mean),
+            'std': float(std),
+            'min': int(lo),
+            'max': int(hi),
+            'current': series.current,
             'sample_size': len(trophies)
         }
     
     def estimate_ou_parameters(self, 
-                              snapshots: List[Dict[str, Any]]) -> Dict[str, float]:
+                              snapshots: SnapshotsOrSeries,
+                              presorted: bool = False) -> Dict[str, float]:
         """
         Estimate Ornstein-Uhlenbeck process parameters.
         
@@ -103,14 +315,10 @@ class TrophyVolatilityModel:
                 'quality': 'insufficient_data'
             }
         
-        # Extract trophy values and time points
-        snapshots = sorted(snapshots, key=lambda x: x['snapshot_time'])
-        trophies = np.array([s['trophies'] for s in snapshots])
-        
-        # Compute time deltas (in days)
-        times = [(s['snapshot_time'] - snapshots[0]['snapshot_time']).total_seconds() / 86400 
-                for s in snapshots]
-        dt = np.diff(times)
+        # Trophy values and time points (days since the first snapshot)
+        series = _as_series(snapshots, presorted=presorted, with_days=True)
+        trophies = series.trophies
+        dt = np.diff(series.days)
         
         # Simple estimation using discrete approximation
         # X_{t+1} - X_t = θ(μ - X_t)Δt + σ√Δt ε
@@ -125,31 +333,23 @@ class TrophyVolatilityModel:
         
         # Regression: dX = a + b*X_t + noise
         # where a = θ*μ*dt, b = -θ*dt
-        if len(dt) > 0:
-            avg_dt = np.mean(dt)
-        else:
-            avg_dt = 1
+        avg_dt = max(float(np.mean(dt)), 1e-9)
         
         # Linear regression
         A = np.vstack([np.ones(len(X_t)), X_t]).T
-        coeffs, residuals, _, _ = np.linalg.lstsq(A, dX, rcond=None)
+        coeffs, _, _, _ = np.linalg.lstsq(A, dX, rcond=None)
         
         a, b = coeffs
         
-        # Extract parameters
-        if b < 0 and avg_dt > 0:
-            theta = -b / avg_dt
-            theta = max(theta, 0.01)  # Avoid negative/zero
-        else:
-            theta = 0.1  # Default
+        # Extract parameters: no mean reversion (b >= 0) falls back to the 0.1 default,
+        # then clamp to a sane range instead of branching
+        theta = float(np.clip(np.where(b < 0, -b / avg_dt, 0.1), 0.01, 10.0))
         
-        # Estimate sigma from residuals
-        if residuals.size > 0:
-            sigma = np.sqrt(residuals[0] / len(X_t))
-        else:
-            sigma = np.std(dX)
+        # Estimate sigma from residuals (valid even for rank-deficient fits)
+        residuals = dX - A @ coeffs
+        sigma = max(float(np.sqrt(np.mean(residuals * residuals))), 1e-9)
         
-        quality = 'good' if len(snapshots) >= 20 else 'moderate'
+        quality = 'good' if len(series) >= 20 else 'moderate'
         
         return {
             'mu': mu,  # Equilibrium trophy level (skill)
@@ -159,8 +359,9 @@ class TrophyVolatilityModel:
         }
     
     def compute_volatility_index(self, 
-                                snapshots: List[Dict[str, Any]],
-                                window_days: int = 14) -> Dict[str, Any]:
+                                snapshots: SnapshotsOrSeries,
+                                window_days: int = 14,
+                                presorted: bool = False) -> Dict[str, Any]:
         """
         Compute rolling volatility index.
         
@@ -179,25 +380,19 @@ class TrophyVolatilityModel:
                 'interpretation': 'insufficient_data'
             }
         
-        snapshots = sorted(snapshots, key=lambda x: x['snapshot_time'])
-        trophies = [s['trophies'] for s in snapshots]
+        trophies = _as_series(snapshots, presorted=presorted).trophies
         
-        # Compute returns (percentage changes)
-        returns = []
-        for i in range(1, len(trophies)):
-            if trophies[i-1] != 0:
-                ret = (trophies[i] - trophies[i-1]) / trophies[i-1]
-                returns.append(ret)
+        # Volatility = standard deviation of returns (percentage changes)
+        volatility, n_returns = _return_volatility(trophies)
         
-        if not returns:
+        if n_returns == 0:
             return {
                 'volatility_index': 0,
                 'stability_score': 0,
                 'interpretation': 'insufficient_data'
             }
         
-        # Volatility = standard deviation of returns
-        volatility = float(np.std(returns))
+        volatility = float(volatility)
         
         # Stability score: inverse of volatility (0-100 scale)
         # Normalize: typical volatility is 0-0.1 (0-10% changes)
@@ -222,11 +417,11 @@ class TrophyVolatilityModel:
             'stability_score': stability,
             'interpretation': interpretation,
             'description': description,
-            'sample_size': len(returns)
+            'sample_size': int(n_returns)
         }
     
     def decompose_skill_luck(self, 
-                            snapshots: List[Dict[str, Any]],
+                            snapshots: SnapshotsOrSeries,
                             ou_params: Dict[str, float]) -> Dict[str, Any]:
         """
         Decompose trophy trajectory into skill (signal) and luck (noise).
@@ -243,56 +438,32 @@ class TrophyVolatilityModel:
         mu = ou_params.get('mu', 0)
         sigma = ou_params.get('sigma', 0)
         
-        if not snapshots or mu == 0:
+        if not len(snapshots) or mu == 0:
             return {
                 'skill_estimate': 0,
                 'luck_contribution': 0,
                 'skill_confidence': 'low'
             }
         
-        current_trophies = snapshots[-1]['trophies']
-        
-        # Skill estimate = equilibrium level (mu)
-        skill_estimate = mu
-        
-        # Luck contribution = current deviation from equilibrium
-        luck_contribution = current_trophies - mu
+        series = _as_series(snapshots)
+        current_trophies = series.current
+        n = len(series)
         
-        # Confidence based on sample size and volatility
-        n = len(snapshots)
-        if n >= 30 and sigma > 0:
-            # Standard error of mean
-            se = sigma / np.sqrt(n)
-            confidence_interval = 1.96 * se  # 95% CI
-            
-            if confidence_interval < mu * 0.05:  # CI < 5% of estimate
-                confidence = 'high'
-            elif confidence_interval < mu * 0.15:
-                confidence = 'medium'
-            else:
-                confidence = 'low'
-        else:
-            confidence = 'low'
-        
-        # Interpret luck
-        if luck_contribution > sigma:
-            luck_interpretation = 'currently_overperforming'
-        elif luck_contribution < -sigma:
-            luck_interpretation = 'currently_underperforming'
-        else:
-            luck_interpretation = 'performing_near_skill_level'
+        skill_estimate, luck_contribution, confidence_interval, conf_code, luck_code = \
+            _decompose_numeric(float(current_trophies), float(mu), float(sigma), n)
         
         return {
             'skill_estimate': int(skill_estimate),
             'current_trophies': current_trophies,
             'luck_contribution': int(luck_contribution),
-            'luck_interpretation': luck_interpretation,
-            'skill_confidence': confidence,
-            'confidence_interval': int(confidence_interval) if n >= 30 and sigma > 0 else None
+            'luck_interpretation': _LUCK_INTERPRETATIONS[luck_code],
+            'skill_confidence': _CONFIDENCE_LEVELS[conf_code],
+            'confidence_interval': int(confidence_interval) if confidence_interval >= 0 else None
         }
     
     def detect_momentum_tilt(self, 
-                            snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+                            snapshots: SnapshotsOrSeries,
+                            presorted: bool = False) -> Dict[str, Any]:
         """
         Detect momentum (winning streak) or tilt (losing streak).
         
@@ -313,24 +484,18 @@ class TrophyVolatilityModel:
                 'description': 'Insufficient data'
             }
         
-        snapshots = sorted(snapshots, key=lambda x: x['snapshot_time'])[-14:]  # Last 14 snapshots
-        trophies = [s['trophies'] for s in snapshots]
+        trophies = _as_series(snapshots, presorted=presorted).trophies[-14:]  # Last 14 snapshots
         
-        # Compute short-term trend (recent slope)
-        x = np.arange(len(trophies))
-        slope, _ = np.polyfit(x, trophies, 1)
-        
-        # Compute streak strength
-        changes = np.diff(trophies)
-        positive_changes = sum(1 for c in changes if c > 0)
-        negative_changes = sum(1 for c in changes if c < 0)
+        # Short-term trend (recent slope) and streak strength
+        slope, positive_changes, negative_changes = _momentum_kernel(trophies)
+        n_changes = len(trophies) - 1
         
         # State determination
-        if slope > 10 and positive_changes > len(changes) * 0.6:
+        if slope > 10 and positive_changes > n_changes * 0.6:
             state = 'positive_momentum'
             strength = min(slope / 50, 1.0)  # Normalize
             description = 'On a winning streak, climbing trophies'
-        elif slope < -10 and negative_changes > len(changes) * 0.6:
+        elif slope < -10 and negative_changes > n_changes * 0.6:
             state = 'tilt'
             strength = min(abs(slope) / 50, 1.0)
             description = 'On a losing streak, potential tilt'
@@ -349,64 +514,82 @@ class TrophyVolatilityModel:
         }
     
     def forecast_trajectory(self,
-                          snapshots: List[Dict[str, Any]],
+                          snapshots: SnapshotsOrSeries,
                           ou_params: Dict[str, float],
                           days_ahead: int = 30,
-                          n_simulations: int = 1000) -> Dict[str, Any]:
+                          n_simulations: int = 1000,
+                          return_paths: bool = False) -> Dict[str, Any]:
         """
-        Forecast future trophy trajectory using Monte Carlo simulation.
+        Forecast future trophy trajectory using the OU process.
         
         Educational: Stochastic simulation for prediction.
         
-        Simulates future paths using OU process:
-        - Generates 1000 possible trajectories
-        - Computes confidence intervals
-        - Estimates probability of reaching milestones
+        The daily recurrence X_{t+1} = μ + a(X_t - μ) + σ√dt ε, with
+        a = 1 - θdt, is linear in Gaussian noise, so the terminal value is
+        exactly normal:
+            mean = μ + (X_0 - μ)a^n
+            var  = σ²dt (1 - a^{2n}) / (1 - a²)
+        Terminal statistics are therefore computed in closed form.
+        
+        Pass return_paths=True to also get per-day mean/p5/p95 bands
+        (e.g. for plotting); these come from n_simulations Monte Carlo paths.
         
         Returns:
             Forecast with confidence bands
         """
-        if not snapshots or ou_params.get('quality') == 'insufficient_data':
+        if not len(snapshots) or ou_params.get('quality') == 'insufficient_data':
             return {
                 'forecast_available': False,
                 'reason': 'insufficient_data'
             }
         
-        current = snapshots[-1]['trophies']
+        current = _as_series(snapshots).current
         mu = ou_params['mu']
         theta = ou_params['theta']
         sigma = ou_params['sigma']
         
-        # Monte Carlo simulation
         dt = 1  # 1 day steps
         n_steps = days_ahead
         
-        trajectories = np.zeros((n_simulations, n_steps + 1))
-        trajectories[:, 0] = current
-        
-        for t in range(n_steps):
-            # OU process: X_{t+1} = X_t + θ(μ - X_t)dt + σ√dt ε
-            dW = np.random.randn(n_simulations)
-            trajectories[:, t+1] = (
-                trajectories[:, t] + 
-                theta * (mu - trajectories[:, t]) * dt +
-                sigma * np.sqrt(dt) * dW
+        # Exact terminal distribution of the discretized OU recurrence
+        a = 1 - theta * dt
+        a2 = a * a
+        if abs(1 - a2) < 1e-12:
+            var_factor = n_steps
+        else:
+            var_factor = (1 - a2 ** n_steps) / (1 - a2)
+        expected = mu + (current - mu) * a ** n_steps
+        std_terminal = sigma * np.sqrt(dt * var_factor)
+        percentile_5 = expected - _Z_95 * std_terminal
+        percentile_95 = expected + _Z_95 * std_terminal
+        
+        if return_paths:
+            # Monte Carlo paths for per-day bands
+            trajectories = _simulate_ou_paths(
+                float(current), float(mu), float(theta), float(sigma),
+                float(dt), n_steps, n_simulations
             )
+            mean_band = np.mean(trajectories, axis=0)
+            p5_band, p95_band = np.percentile(trajectories, [5, 95], axis=0)
         
-        # Compute statistics
-        mean_forecast = np.mean(trajectories, axis=0)
-        percentile_5 = np.percentile(trajectories, 5, axis=0)
-        percentile_95 = np.percentile(trajectories, 95, axis=0)
-        
-        return {
+        forecast = {
             'forecast_available': True,
             'days_ahead': days_ahead,
             'current_trophies': int(current),
-            'expected_trophies': int(mean_forecast[-1]),
-            'confidence_interval_95': (int(percentile_5[-1]), int(percentile_95[-1])),
+            'expected_trophies': int(expected),
+            'confidence_interval_95': (int(percentile_5), int(percentile_95)),
             'mean_reversion_target': int(mu),
-            'interpretation': self._interpret_forecast(current, mean_forecast[-1], mu)
+            'interpretation': self._interpret_forecast(current, expected, mu)
         }
+        
+        if return_paths:
+            forecast['daily_bands'] = {
+                'mean': mean_band.tolist(),
+                'percentile_5': p5_band.tolist(),
+                'percentile_95': p95_band.tolist()
+            }
+        
+        return forecast
     
     def _interpret_forecast(self, current: float, forecast: float, mu: float) -> str:
         """
@@ -432,29 +615,34 @@ class TrophyVolatilityModel:
     
     def generate_player_report(self,
                               player_tag: str,
-                              snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+                              snapshots: SnapshotsOrSeries) -> Dict[str, Any]:
         """
         Generate comprehensive trophy volatility report for a player.
         
-        Main entry point for player analysis.
+        Main entry point for player analysis. Accepts snapshot dicts (any
+        order) or a TrophySeries already built from chronologically sorted
+        snapshots.
         """
+        # Convert once; every sub-analysis works on the same chronological columns
+        series = _as_series(snapshots, presorted=False, with_days=True)
+        
         # Basic stats
-        stats = self.compute_trophy_statistics(snapshots)
+        stats = self.compute_trophy_statistics(series)
         
         # OU parameters
-        ou_params = self.estimate_ou_parameters(snapshots)
+        ou_params = self.estimate_ou_parameters(series)
         
         # Volatility
-        volatility = self.compute_volatility_index(snapshots)
+        volatility = self.compute_volatility_index(series)
         
         # Skill/luck decomposition
-        decomposition = self.decompose_skill_luck(snapshots, ou_params)
+        decomposition = self.decompose_skill_luck(series, ou_params)
         
         # Momentum/tilt
-        momentum = self.detect_momentum_tilt(snapshots)
+        momentum = self.detect_momentum_tilt(series)
         
         # Forecast
-        forecast = self.forecast_trajectory(snapshots, ou_params, days_ahead=30)
+        forecast = self.forecast_trajectory(series, ou_params, days_ahead=30, return_paths=False)
         
         return {
             'model': self.name,
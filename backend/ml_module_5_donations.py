@@ -15,14 +15,187 @@ Educational Value:
 Demonstrates graph analytics and economic network theory.
 """
 
+import copy
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from collections import defaultdict
+from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import logging
+from scipy.sparse import csr_matrix
+
+from numba_compat import njit
 
 logger = logging.getLogger(__name__)
 
+# Integer role codes used by the columnar (SoA) view of the graph
+PARASITE, MILD_PARASITE, BALANCED, BENEFACTOR, INACTIVE = range(5)
+ROLE_NAMES = np.array(['parasite', 'mild_parasite', 'balanced', 'benefactor', 'inactive'])
+PARASITE_MASK = (1 << PARASITE) | (1 << MILD_PARASITE)
+
+# Retention risk type per role code (benefactors only count as burnout
+# risks above the net-giving threshold)
+ROLE_RISK_TYPE = np.array(['exploitation', 'exploitation', 'low', 'burnout', 'disengagement'])
+
+# Health-score cut-offs for grades D | C | B | A
+_GRADE_BINS = np.array([45, 60, 75])
+_GRADE_LETTERS = 'DCBA'
+_GRADE_INTERPRETATIONS = (
+    'Significant economic imbalances',
+    'Moderate issues detected',
+    'Good but room for improvement',
+    'Healthy donation economy'
+)
+
+# Report body for a clan with no matching snapshots (deep-copied per call)
+_NO_DATA_REPORT = {
+    'status': 'no_data',
+    'network_stats': {
+        'total_members': 0,
+        'total_giving': 0,
+        'total_receiving': 0
+    },
+    'parasites_detected': 0
+}
+
+
+@dataclass(frozen=True, slots=True)
+class DonationThresholds:
+    """Tunable cut-offs used by DonationNetworkModel."""
+    # Donation-ratio bin edges: parasite | mild_parasite | balanced | benefactor
+    ratio_mild: float = 0.3
+    ratio_balanced: float = 0.8
+    ratio_benefactor: float = 2.0
+    
+    # Centrality normalizers (score saturates at 1.0)
+    volume_norm: float = 1000.0
+    generosity_norm: float = 500.0
+    velocity_norm: float = 10.0
+    
+    # Gini interpretation and health cut-offs
+    gini_equal: float = 0.3
+    gini_moderate: float = 0.5
+    health_gini_moderate: float = 0.4
+    health_gini_risk: float = 0.6
+    
+    # Retention risk
+    burnout_net: float = 1000.0
+    burnout_scale: float = 2000.0
+    high_risk: float = 0.6
+
+
+@njit(['float64(float64[:])', 'float64(float32[:])'], cache=True)
+def _gini_kernel(arr):
+    """
+    Gini coefficient of a non-negative float32/float64 array.
+    
+    With ascending x and cumulative sums C_k = x_1 + ... + x_k,
+    G = (n + 1 - 2·ΣC_k / Σx) / n, equivalent to Σ(2i - n - 1)·x_i / (n·Σx)
+    without materializing the index weights.
+    
+    The sort runs in the input precision; sums accumulate in float64.
+    """
+    n = arr.shape[0]
+    if n == 0:
+        return 0.0
+    
+    sorted_arr = np.sort(arr).astype(np.float64)
+    total = sorted_arr.sum()
+    if total == 0:
+        return 0.0
+    
+    cumulative = np.cumsum(sorted_arr)
+    return (n + 1 - 2 * (cumulative.sum() / total)) / n
+
+
+def _pagerank_sparse(adj_csr: csr_matrix,
+                     alpha: float = 0.85,
+                     tol: float = 1e-6,
+                     max_iter: int = 100) -> np.ndarray:
+    """
+    Weighted PageRank by power iteration on a sparse adjacency matrix.
+    
+    adj_csr[i, j] is the donation volume flowing from player i to player j.
+    Each step is one sparse mat-vec, x' = α·Pᵀx + (1 - α)/n with P the
+    row-normalized adjacency; rank lost through players who give nothing
+    (dangling nodes) is spread uniformly. Stops when ‖x' - x‖₁ < tol.
+    
+    Returns:
+        PageRank scores (sum to 1), one per node
+    """
+    n = adj_csr.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    
+    out_weight = np.asarray(adj_csr.sum(axis=1)).ravel()
+    inv_out = np.divide(1.0, out_weight, out=np.zeros(n), where=out_weight > 0)
+    transition_t = csr_matrix(adj_csr.multiply(inv_out[:, None])).T.tocsr()
+    dangling = out_weight == 0
+    
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        x_new = alpha * (transition_t @ x + x[dangling].sum() / n) + (1 - alpha) / n
+        x_new /= x_new.sum()
+        if np.abs(x_new - x).sum() < tol:
+            return x_new
+        x = x_new
+    
+    logger.debug("PageRank did not converge in %d iterations", max_iter)
+    return x
+
+
+def normalize_snapshot(snap: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fill the fields the donation model reads with their defaults (in place).
+    
+    Call once when snapshots are loaded so the graph build can use plain
+    subscripts instead of .get() with defaults.
+    """
+    snap.setdefault('clan_tag', None)
+    snap.setdefault('donations', 0)
+    snap.setdefault('donations_received', 0)
+    return snap
+
+
+@dataclass(slots=True)
+class NodeRecord:
+    """One player node of the donation graph."""
+    player_tag: str
+    player_name: str
+    donations_given: int
+    donations_received: int
+    net_donations: int
+    donation_ratio: float
+    velocity_given: float
+    velocity_received: float
+    role: str
+    snapshots_count: int
+    centrality_score: Optional[float] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize as a plain dict for the report payload."""
+        return asdict(self)
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores, descending.
+    
+    Matches a stable descending sort truncated to k (ties keep index
+    order) but only sorts the selected entries: O(n + k log k).
+    """
+    n = scores.size
+    if k >= n:
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - above.size]
+    idx = np.sort(np.concatenate((above, ties)))
+    return idx[np.argsort(-scores[idx], kind='stable')]
+
 
 class DonationNetworkModel:
     """
@@ -47,12 +220,16 @@ class DonationNetworkModel:
        - Sustainability: Are parasites driving away benefactors?
     """
     
-    def __init__(self):
+    def __init__(self, thresholds: Optional[DonationThresholds] = None):
         self.name = "donation_network"
+        self.th = thresholds or DonationThresholds()
+        self._role_ratio_bins = np.array([
+            self.th.ratio_mild, self.th.ratio_balanced, self.th.ratio_benefactor
+        ])
     
     def build_donation_graph(self,
                            player_snapshots: List[Dict[str, Any]],
-                           clan_tag: str) -> Dict[str, Any]:
+                           clan_tag: Optional[str]) -> Dict[str, Any]:
         """
         Build donation network graph from player snapshots.
         
@@ -63,87 +240,138 @@ class DonationNetworkModel:
         2. Build nodes with net donation statistics
         3. Infer network structure from aggregate patterns
         
+        Alongside the per-player `nodes` records, the graph carries `cols`:
+        parallel NumPy arrays (one entry per node) that the metric methods
+        operate on directly.
+        
+        Snapshot schema (see normalize_snapshot): every snapshot must carry
+        player_tag, name, snapshot_time, clan_tag, donations and
+        donations_received.
+        
+        Args:
+            player_snapshots: Snapshots to build the graph from
+            clan_tag: Clan to keep; None if the snapshots are already
+                limited to a single clan
+        
         Returns:
-            Graph structure with nodes and aggregated metrics
+            Graph structure with NodeRecord nodes, columns and aggregated metrics
         """
-        # Group snapshots by player
-        player_data = defaultdict(list)
-        for snap in player_snapshots:
-            if snap.get('clan_tag') == clan_tag:
-                player_data[snap['player_tag']].append(snap)
+        if clan_tag is not None:
+            player_snapshots = [snap for snap in player_snapshots
+                                if snap['clan_tag'] == clan_tag]
         
-        nodes = []
-        
-        for player_tag, snapshots in player_data.items():
-            if not snapshots:
+        # Single pass: keep only each player's earliest and latest snapshot
+        player_data = {}
+        for snap in player_snapshots:
+            record = player_data.get(snap['player_tag'])
+            if record is None:
+                player_data[snap['player_tag']] = {'first': snap, 'last': snap, 'count': 1}
                 continue
             
-            # Sort by time
-            snapshots = sorted(snapshots, key=lambda x: x['snapshot_time'])
-            latest = snapshots[-1]
+            record['count'] += 1
+            snap_time = snap['snapshot_time']
+            if snap_time < record['first']['snapshot_time']:
+                record['first'] = snap
+            if snap_time >= record['last']['snapshot_time']:
+                record['last'] = snap
+        
+        tag_col, name_col, count_col = [], [], []
+        given_col, received_col, net_col = [], [], []
+        first_given_col, first_received_col = [], []
+        first_time_col, last_time_col = [], []
+        total_given = 0
+        total_received = 0
+        
+        for player_tag, record in player_data.items():
+            first = record['first']
+            latest = record['last']
             
             # Current donation stats
-            donations_given = latest.get('donations', 0)
-            donations_received = latest.get('donations_received', 0)
-            net_donations = donations_given - donations_received
-            
-            # Donation velocity (donations per day)
-            if len(snapshots) >= 2:
-                days = (snapshots[-1]['snapshot_time'] - snapshots[0]['snapshot_time']).days
-                if days > 0:
-                    velocity_given = (snapshots[-1]['donations'] - snapshots[0]['donations']) / days
-                    velocity_received = (snapshots[-1]['donations_received'] - snapshots[0]['donations_received']) / days
-                else:
-                    velocity_given = 0
-                    velocity_received = 0
-            else:
-                velocity_given = 0
-                velocity_received = 0
+            donations_given = latest['donations']
+            donations_received = latest['donations_received']
+            total_given += donations_given
+            total_received += donations_received
             
-            # Classify role
-            role = self._classify_donation_role(donations_given, donations_received)
-            
-            nodes.append({
-                'player_tag': player_tag,
-                'player_name': latest['name'],
-                'donations_given': donations_given,
-                'donations_received': donations_received,
-                'net_donations': net_donations,
-                'donation_ratio': donations_given / max(donations_received, 1),
-                'velocity_given': velocity_given,
-                'velocity_received': velocity_received,
-                'role': role,
-                'snapshots_count': len(snapshots)
-            })
+            tag_col.append(player_tag)
+            name_col.append(latest['name'])
+            count_col.append(record['count'])
+            given_col.append(donations_given)
+            received_col.append(donations_received)
+            net_col.append(donations_given - donations_received)
+            first_given_col.append(first['donations'])
+            first_received_col.append(first['donations_received'])
+            first_time_col.append(first['snapshot_time'])
+            last_time_col.append(latest['snapshot_time'])
+        
+        # Counts (and net, an integer) are stored as int32/float32 to halve
+        # the bytes every reduction has to move; they are upcast before any
+        # arithmetic that reaches the report. Fractional metrics (ratio,
+        # velocity) stay float64 so report values and role bins agree.
+        given = np.asarray(given_col, dtype=np.int32)
+        received = np.asarray(received_col, dtype=np.int32)
+        
+        # Donation velocity (donations per day) over each player's observed
+        # span in whole days; zero for single snapshots or sub-day spans
+        elapsed = (np.array(last_time_col, dtype='datetime64[us]') -
+                   np.array(first_time_col, dtype='datetime64[us]'))
+        days = (elapsed // np.timedelta64(1, 'D')).astype(np.int32)
+        span = np.maximum(days, 1)
+        velocity_given = np.where(days > 0, (given - np.asarray(first_given_col)) / span, 0.0)
+        velocity_received = np.where(days > 0, (received - np.asarray(first_received_col)) / span, 0.0)
+        
+        # Classify roles for all players at once
+        ratio = given / np.maximum(received, 1)
+        role_code = self._classify_donation_roles(given, received, ratio)
+        
+        nodes = [
+            NodeRecord(*fields) for fields in zip(
+                tag_col, name_col, given_col, received_col, net_col,
+                ratio.tolist(), velocity_given.tolist(), velocity_received.tolist(),
+                ROLE_NAMES[role_code].tolist(), count_col)
+        ]
+        
+        cols = {
+            'given': given,
+            'received': received,
+            'velocity_given': velocity_given,
+            'net': np.asarray(net_col, dtype=np.float32),
+            'ratio': ratio,
+            'role_code': role_code
+        }
         
         return {
             'nodes': nodes,
+            'cols': cols,
             'total_members': len(nodes),
+            'total_giving': total_given,
+            'total_receiving': total_received,
             'graph_type': 'directed_weighted'
         }
     
-    def _classify_donation_role(self, given: int, received: int) -> str:
+    def _classify_donation_roles(self,
+                                 given: np.ndarray,
+                                 received: np.ndarray,
+                                 ratio: np.ndarray) -> np.ndarray:
         """
-        Classify player's role in donation economy.
+        Classify players' roles in donation economy.
         
         Educational: Threshold-based classification.
-        """
-        if given == 0 and received == 0:
-            return 'inactive'
         
-        ratio = given / max(received, 1)
+        ratio = given / max(received, 1) is binned at the ratio_mild /
+        ratio_balanced / ratio_benefactor thresholds (0.3 / 0.8 / 2.0) into
+        parasite, mild_parasite, balanced, benefactor; players with no
+        donation activity at all are inactive.
         
-        if ratio >= 2.0:
-            return 'benefactor'
-        elif ratio >= 0.8:
-            return 'balanced'
-        elif ratio >= 0.3:
-            return 'mild_parasite'
-        else:
-            return 'parasite'
+        Returns:
+            Integer role codes (index into ROLE_NAMES)
+        """
+        role_code = np.digitize(ratio, self._role_ratio_bins)
+        return np.where((given == 0) & (received == 0), INACTIVE, role_code)
     
     def compute_network_centrality(self,
-                                  graph: Dict[str, Any]) -> List[Dict[str, Any]]:
+                                  graph: Dict[str, Any],
+                                  top_k: Optional[int] = None,
+                                  adjacency: Optional[csr_matrix] = None) -> List[Dict[str, Any]]:
         """
         Compute centrality scores for network nodes.
         
@@ -152,6 +380,17 @@ class DonationNetworkModel:
         High centrality = critical to clan economy
         If high centrality player leaves, donation economy collapses.
         
+        The API only exposes per-player totals, so by default centrality
+        is a weighted heuristic over volume, generosity and consistency.
+        When donor -> recipient flows are known, pass them as a sparse
+        adjacency matrix (built directly, e.g.
+        csr_matrix((weights, (donors, recipients)), shape=(n, n)), in node
+        order) and real weighted PageRank is used instead.
+        
+        Args:
+            top_k: Only return the k most central nodes (default: all)
+            adjacency: Optional n x n donation-flow matrix
+        
         Returns:
             Nodes ranked by centrality (importance)
         """
@@ -160,31 +399,53 @@ class DonationNetworkModel:
         if not nodes:
             return []
         
-        # Compute simple centrality based on:
-        # 1. Absolute giving (volume)
-        # 2. Net giving (generosity)
-        # 3. Consistency (velocity)
+        if adjacency is not None:
+            if adjacency.shape != (len(nodes), len(nodes)):
+                raise ValueError(
+                    f"adjacency must be {len(nodes)}x{len(nodes)}, got {adjacency.shape}"
+                )
+            centrality = _pagerank_sparse(csr_matrix(adjacency, dtype=np.float64))
+        else:
+            centrality = self._heuristic_centrality(graph['cols'])
         
-        for node in nodes:
-            # Centrality score components
-            volume_score = min(node['donations_given'] / 1000, 1.0)  # Normalize by 1000
-            generosity_score = min(max(node['net_donations'], 0) / 500, 1.0)
-            consistency_score = min(node['velocity_given'] / 10, 1.0)
-            
-            # Weighted combination
-            centrality = (
-                volume_score * 0.5 +
-                generosity_score * 0.3 +
-                consistency_score * 0.2
-            )
-            
-            node['centrality_score'] = centrality
+        # Rank by centrality (stable, so ties keep roster order)
+        if top_k is None:
+            order = np.argsort(-centrality, kind='stable')
+        else:
+            order = _top_k_indices(centrality, top_k)
         
-        # Rank by centrality
-        ranked = sorted(nodes, key=lambda x: x['centrality_score'], reverse=True)
+        # Only the returned nodes get their score written back
+        ranked = []
+        for i, score in zip(order.tolist(), centrality[order].tolist()):
+            node = nodes[i]
+            node.centrality_score = score
+            ranked.append(node.to_dict())
         
         return ranked
     
+    def _heuristic_centrality(self, cols: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Centrality proxy from per-player totals when no flow edges exist.
+        """
+        # Compute simple centrality based on:
+        # 1. Absolute giving (volume)
+        # 2. Net giving (generosity)
+        # 3. Consistency (velocity)
+        th = self.th
+        volume_score = np.clip(cols['given'] / th.volume_norm, None, 1.0)
+        generosity_score = np.clip(cols['net'].astype(np.float64) / th.generosity_norm, 0.0, 1.0)
+        # Velocity can be negative (season resets), so no lower clamp here
+        consistency_score = np.clip(cols['velocity_given'] / th.velocity_norm, None, 1.0)
+        
+        # Weighted combination
+        centrality = (
+            volume_score * 0.5 +
+            generosity_score * 0.3 +
+            consistency_score * 0.2
+        )
+        
+        return centrality
+    
     def compute_economic_inequality(self,
                                    graph: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -207,19 +468,17 @@ class DonationNetworkModel:
                 'interpretation': 'no_data'
             }
         
-        # Extract giving and receiving distributions
-        giving = [n['donations_given'] for n in nodes]
-        receiving = [n['donations_received'] for n in nodes]
-        
-        # Compute Gini coefficients
-        gini_giving = self._compute_gini(giving)
-        gini_receiving = self._compute_gini(receiving)
+        # Compute Gini coefficients over the giving and receiving distributions
+        cols = graph['cols']
+        gini_giving = self._compute_gini(cols['given'])
+        gini_receiving = self._compute_gini(cols['received'])
         
         # Interpret
-        if gini_giving < 0.3:
+        th = self.th
+        if gini_giving < th.gini_equal:
             giving_interp = 'equal'
             giving_desc = 'Donations distributed evenly across members'
-        elif gini_giving < 0.5:
+        elif gini_giving < th.gini_moderate:
             giving_interp = 'moderate'
             giving_desc = 'Some members give significantly more than others'
         else:
@@ -227,10 +486,10 @@ class DonationNetworkModel:
             giving_desc = 'Donation giving highly concentrated in few members'
         
         # Health assessment
-        if gini_giving > 0.6:
+        if gini_giving > th.health_gini_risk:
             health_status = 'at_risk'
             health_desc = 'High dependence on few benefactors - retention risk'
-        elif gini_giving > 0.4:
+        elif gini_giving > th.health_gini_moderate:
             health_status = 'moderate'
             health_desc = 'Moderate inequality - encourage broader participation'
         else:
@@ -246,60 +505,58 @@ class DonationNetworkModel:
             'health_description': health_desc
         }
     
-    def _compute_gini(self, values: List[float]) -> float:
+    def _compute_gini(self, values) -> float:
         """
         Compute Gini coefficient.
         
         Educational: Economic inequality metric.
         """
-        if not values or sum(values) == 0:
-            return 0.0
-        
-        sorted_values = sorted([v for v in values if v >= 0])
-        n = len(sorted_values)
-        
-        if n == 0:
-            return 0.0
-        
-        cumsum = np.cumsum(sorted_values)
-        
-        # Gini formula
-        gini = (2 * sum((i + 1) * val for i, val in enumerate(sorted_values))) / (n * sum(sorted_values)) - (n + 1) / n
-        return max(0, min(float(gini), 1.0))
+        arr = np.ascontiguousarray(values)
+        if arr.dtype != np.float32:
+            arr = arr.astype(np.float64)
+        gini = _gini_kernel(arr[arr >= 0])
+        return max(0.0, min(float(gini), 1.0))
     
     def detect_parasites(self,
                         graph: Dict[str, Any],
-                        threshold_ratio: float = 0.3) -> List[Dict[str, Any]]:
+                        threshold_ratio: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Identify parasitic members (take much more than give).
         
         Educational: Threshold-based anomaly detection.
         
+        Args:
+            threshold_ratio: Maximum donation ratio to flag
+                (default: thresholds.ratio_mild)
+        
         Returns:
             List of parasitic members with exploitation metrics
         """
         nodes = graph['nodes']
-        parasites = []
+        cols = graph['cols']
+        ratio = cols['ratio']
         
-        for node in nodes:
-            ratio = node['donation_ratio']
-            role = node['role']
-            
-            if role in ['parasite', 'mild_parasite'] and ratio < threshold_ratio:
-                exploitation_score = 1 - ratio  # Higher = more exploitative
-                
-                parasites.append({
-                    'player_tag': node['player_tag'],
-                    'player_name': node['player_name'],
-                    'donations_given': node['donations_given'],
-                    'donations_received': node['donations_received'],
-                    'donation_ratio': ratio,
-                    'exploitation_score': exploitation_score,
-                    'role': role
-                })
+        is_parasite = ((1 << cols['role_code']) & PARASITE_MASK) != 0
+        if threshold_ratio is None:
+            threshold_ratio = self.th.ratio_mild
+        candidates = np.flatnonzero(is_parasite & (ratio < threshold_ratio))
+        exploitation = 1 - ratio[candidates]  # Higher = more exploitative
         
         # Sort by exploitation score
-        parasites.sort(key=lambda x: x['exploitation_score'], reverse=True)
+        order = np.argsort(-exploitation, kind='stable')
+        
+        parasites = []
+        for i in order:
+            node = nodes[candidates[i]]
+            parasites.append({
+                'player_tag': node.player_tag,
+                'player_name': node.player_name,
+                'donations_given': node.donations_given,
+                'donations_received': node.donations_received,
+                'donation_ratio': node.donation_ratio,
+                'exploitation_score': float(exploitation[i]),
+                'role': node.role
+            })
         
         return parasites
     
@@ -318,52 +575,51 @@ class DonationNetworkModel:
             Risk scores per player and overall clan risk
         """
         nodes = graph['nodes']
-        
-        risk_scores = []
-        
-        for node in nodes:
-            player_tag = node['player_tag']
-            role = node['role']
-            net_donations = node['net_donations']
-            
-            # Benefactors giving too much may burn out
-            if role == 'benefactor' and net_donations > 1000:
-                risk = min(net_donations / 2000, 1.0)
-                risk_type = 'burnout'
-            # Parasites may be asked to leave
-            elif role in ['parasite', 'mild_parasite']:
-                risk = node.get('exploitation_score', 0.5)
-                risk_type = 'exploitation'
-            # Inactive may naturally drift away
-            elif role == 'inactive':
-                risk = 0.6
-                risk_type = 'disengagement'
-            else:
-                risk = 0.2  # Balanced players are stable
-                risk_type = 'low'
-            
-            risk_scores.append({
-                'player_tag': player_tag,
-                'player_name': node['player_name'],
-                'risk_score': risk,
-                'risk_type': risk_type,
-                'role': role
-            })
+        cols = graph['cols']
+        code = cols['role_code']
+        net = cols['net'].astype(np.float64)
+        
+        # Benefactors giving too much may burn out
+        burnout = (code == BENEFACTOR) & (net > self.th.burnout_net)
+        
+        risk = np.select(
+            [
+                burnout,
+                ((1 << code) & PARASITE_MASK) != 0,  # Parasites may be asked to leave
+                code == INACTIVE                     # Inactive may naturally drift away
+            ],
+            [
+                np.minimum(net / self.th.burnout_scale, 1.0),
+                0.5,  # Nodes carry no exploitation score: neutral default
+                0.6
+            ],
+            default=0.2  # Balanced players are stable
+        )
+        risk_type = np.where((code == BENEFACTOR) & ~burnout, 'low', ROLE_RISK_TYPE[code])
         
         # Overall clan risk: weighted average
-        if risk_scores:
-            avg_risk = float(np.mean([r['risk_score'] for r in risk_scores]))
-        else:
-            avg_risk = 0.0
+        avg_risk = float(risk.mean()) if risk.size else 0.0
         
         # Identify high-risk members
-        high_risk = [r for r in risk_scores if r['risk_score'] > 0.6]
+        high_risk_idx = np.flatnonzero(risk > self.th.high_risk)
+        order = _top_k_indices(risk[high_risk_idx], 10)
+        
+        high_risk_players = []
+        for i in high_risk_idx[order]:
+            node = nodes[i]
+            high_risk_players.append({
+                'player_tag': node.player_tag,
+                'player_name': node.player_name,
+                'risk_score': float(risk[i]),
+                'risk_type': str(risk_type[i]),
+                'role': node.role
+            })
         
         return {
             'average_clan_risk': avg_risk,
-            'high_risk_members': len(high_risk),
-            'high_risk_players': sorted(high_risk, key=lambda x: x['risk_score'], reverse=True)[:10],
-            'total_analyzed': len(risk_scores)
+            'high_risk_members': int(high_risk_idx.size),
+            'high_risk_players': high_risk_players,
+            'total_analyzed': len(nodes)
         }
     
     def compute_reciprocity_index(self,
@@ -385,14 +641,12 @@ class DonationNetworkModel:
             return {'reciprocity_index': 0, 'interpretation': 'no_data'}
         
         # Count role distribution
-        role_counts = defaultdict(int)
-        for node in nodes:
-            role_counts[node['role']] += 1
+        role_counts = np.bincount(graph['cols']['role_code'], minlength=len(ROLE_NAMES)).tolist()
         
         total = len(nodes)
-        balanced_ratio = role_counts['balanced'] / total if total > 0 else 0
-        parasite_ratio = (role_counts['parasite'] + role_counts['mild_parasite']) / total if total > 0 else 0
-        benefactor_ratio = role_counts['benefactor'] / total if total > 0 else 0
+        balanced_ratio = role_counts[BALANCED] / total if total > 0 else 0
+        parasite_ratio = (role_counts[PARASITE] + role_counts[MILD_PARASITE]) / total if total > 0 else 0
+        benefactor_ratio = role_counts[BENEFACTOR] / total if total > 0 else 0
         
         # Reciprocity index: high when most players are balanced
         reciprocity = balanced_ratio - (parasite_ratio * 0.5)
@@ -413,23 +667,37 @@ class DonationNetworkModel:
                 'benefactors': benefactor_ratio,
                 'balanced': balanced_ratio,
                 'parasites': parasite_ratio,
-                'inactive': role_counts['inactive'] / total if total > 0 else 0
+                'inactive': role_counts[INACTIVE] / total if total > 0 else 0
             }
         }
     
     def generate_clan_report(self,
                            player_snapshots: List[Dict[str, Any]],
-                           clan_tag: str) -> Dict[str, Any]:
+                           clan_tag: str,
+                           prefiltered: bool = False) -> Dict[str, Any]:
         """
         Generate comprehensive donation economy report for a clan.
         
         Main entry point for clan analysis.
+        
+        Args:
+            player_snapshots: Player snapshots (may span several clans)
+            clan_tag: Clan to analyze
+            prefiltered: True if player_snapshots only contains this clan
         """
         # Build graph
-        graph = self.build_donation_graph(player_snapshots, clan_tag)
+        graph = self.build_donation_graph(player_snapshots, None if prefiltered else clan_tag)
+        
+        if graph['total_members'] == 0:
+            return {
+                'model': self.name,
+                'clan_tag': clan_tag,
+                'timestamp': datetime.utcnow().isoformat(),
+                **copy.deepcopy(_NO_DATA_REPORT)
+            }
         
-        # Compute centrality
-        ranked_nodes = self.compute_network_centrality(graph)
+        # Compute centrality (the report only shows the top 10)
+        ranked_nodes = self.compute_network_centrality(graph, top_k=10)
         
         # Economic inequality
         inequality = self.compute_economic_inequality(graph)
@@ -449,8 +717,8 @@ class DonationNetworkModel:
             'timestamp': datetime.utcnow().isoformat(),
             'network_stats': {
                 'total_members': graph['total_members'],
-                'total_giving': sum(n['donations_given'] for n in graph['nodes']),
-                'total_receiving': sum(n['donations_received'] for n in graph['nodes'])
+                'total_giving': graph['total_giving'],
+                'total_receiving': graph['total_receiving']
             },
             'top_contributors': ranked_nodes[:10],
             'economic_inequality': inequality,
@@ -461,6 +729,35 @@ class DonationNetworkModel:
             'overall_health_score': self._compute_health_score(inequality, reciprocity, retention)
         }
     
+    def generate_clan_reports(self,
+                            player_snapshots: List[Dict[str, Any]],
+                            clan_tags: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate donation economy reports for many clans at once.
+        
+        Groups the snapshots by clan in a single pass instead of rescanning
+        the full list for every clan.
+        
+        Args:
+            player_snapshots: Player snapshots across any number of clans
+                (normalized, see normalize_snapshot)
+            clan_tags: Clans to report on (default: every clan present)
+        
+        Returns:
+            Reports keyed by clan tag
+        """
+        by_clan = defaultdict(list)
+        for snap in player_snapshots:
+            by_clan[snap['clan_tag']].append(snap)
+        
+        if clan_tags is None:
+            clan_tags = [tag for tag in by_clan if tag is not None]
+        
+        return {
+            tag: self.generate_clan_report(by_clan.get(tag, []), tag, prefiltered=True)
+            for tag in clan_tags
+        }
+    
     def _compute_health_score(self,
                             inequality: Dict[str, Any],
                             reciprocity: Dict[str, float],
@@ -486,18 +783,10 @@ class DonationNetworkModel:
             retention_score * 0.3
         ) * 100
         
-        if health >= 75:
-            grade = 'A'
-            interpretation = 'Healthy donation economy'
-        elif health >= 60:
-            grade = 'B'
-            interpretation = 'Good but room for improvement'
-        elif health >= 45:
-            grade = 'C'
-            interpretation = 'Moderate issues detected'
-        else:
-            grade = 'D'
-            interpretation = 'Significant economic imbalances'
+        # side='right' so a score exactly on a cut-off earns the higher grade
+        idx = int(np.searchsorted(_GRADE_BINS, health, side='right'))
+        grade = _GRADE_LETTERS[idx]
+        interpretation = _GRADE_INTERPRETATIONS[idx]
         
         return {
             'health_score': float(health),
@@ -14,15 +14,88 @@ Educational Value:
 Demonstrates game theory, causal inference, and multi-agent systems.
 """
 
+import os
 import numpy as np
-from typing import List, Dict, Any, Tuple
-from collections import defaultdict
-from datetime import datetime
+from typing import List, Dict, Any, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from datetime import datetime, timezone
 import logging
 
+from numba_compat import njit, NUMBA_AVAILABLE
+
 logger = logging.getLogger(__name__)
 
 
+@njit(cache=True)
+def _gini_kernel(sorted_arr):
+    """
+    Gini coefficient of an ascending, non-negative float64 array.
+    
+    G = Σ(2i - n - 1)·x_i / (n·Σx), i = 1..n
+    """
+    n = sorted_arr.shape[0]
+    total = sorted_arr.sum()
+    if n == 0 or total == 0:
+        return 0.0
+    
+    index = np.arange(1, n + 1)
+    return np.sum((2.0 * index - n - 1) * sorted_arr) / (n * total)
+
+
+# Compile at import so the first report request doesn't pay JIT cost
+if NUMBA_AVAILABLE:
+    _gini_kernel(np.ones(2))
+
+
+def _sorted_percentile(sorted_arr: np.ndarray, q: float) -> float:
+    """
+    q-th percentile of an ascending, non-empty array.
+    
+    Same linear interpolation as np.percentile, read directly off the
+    sorted values.
+    """
+    h = (sorted_arr.size - 1) * (q / 100)
+    lo = int(h)
+    if lo >= sorted_arr.size - 1:
+        return float(sorted_arr[-1])
+    
+    a, b = float(sorted_arr[lo]), float(sorted_arr[lo + 1])
+    t = h - lo
+    # Interpolate from the nearer end, as NumPy does, for the same rounding
+    return a + (b - a) * t if t < 0.5 else b - (b - a) * (1 - t)
+
+
+def _summarize(sorted_arr: np.ndarray) -> Tuple[float, float, float, float, float]:
+    """
+    Distribution summary of an ascending float64 array in one place.
+    
+    Returns:
+        (total, mean, median, sum of the top 10% (at least one value), Gini)
+        with the Gini taken over the non-negative values only
+    """
+    n = sorted_arr.size
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0
+    if n == 1:
+        value = float(sorted_arr[0])
+        return value, value, value, value, 0.0
+    
+    total = float(sorted_arr.sum())
+    mid = n // 2
+    median = float(sorted_arr[mid]) if n % 2 else float((sorted_arr[mid - 1] + sorted_arr[mid]) / 2)
+    top_10_sum = float(sorted_arr[-max(1, n // 10):].sum())
+    
+    if total == 0:
+        gini = 0.0
+    else:
+        # Sorted, so the non-negative values are a suffix
+        gini = _gini_kernel(sorted_arr[np.searchsorted(sorted_arr, 0.0):])
+        gini = max(0.0, min(float(gini), 1.0))
+    
+    return total, total / n, median, top_10_sum, gini
+
+
 class CapitalInvestmentModel:
     """
     Models clan capital as collective action problem.
@@ -47,81 +120,174 @@ class CapitalInvestmentModel:
     def __init__(self):
         self.name = "capital_investment"
     
+    def _to_soa(self, raid_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Materialize raid data as columns once per report.
+        
+        Returns:
+            Per-raid `loots`/`attacks`, and per member row `member_pids`
+            (index into `tag_vocab`, numbered by first appearance),
+            `member_contribs`, `member_attacks` and `member_raid_idx`
+        """
+        n_raids = len(raid_data)
+        # CapitalRaidSeason stores the raid totals as ints
+        loots = np.fromiter((r.get('total_loot', 0) for r in raid_data), dtype=np.int64, count=n_raids)
+        attacks = np.fromiter((r.get('total_attacks', 0) for r in raid_data), dtype=np.int64, count=n_raids)
+        
+        # Flatten member rows of all raids into parallel columns
+        member_lists = [raid.get('member_contributions', []) for raid in raid_data]
+        rows = [member for members in member_lists for member in members]
+        # Note: API uses 'looted' for contributions
+        contributed = np.asarray([member.get('capital_resources_looted', 0) for member in rows])
+        member_attacks = np.asarray([member.get('attacks', 0) for member in rows])
+        raid_idx = np.repeat(
+            np.arange(n_raids, dtype=np.int32),
+            np.fromiter(map(len, member_lists), dtype=np.intp, count=n_raids)
+        )
+        
+        # Integer player ids, numbered in order of first appearance
+        player_ids = {}
+        assign_id = player_ids.setdefault
+        pids = np.fromiter(
+            (assign_id(member['tag'], len(player_ids)) for member in rows),
+            dtype=np.intp, count=len(rows)
+        )
+        
+        return {
+            'loots': loots,
+            'attacks': attacks,
+            'member_pids': pids,
+            'member_contribs': contributed,
+            'member_attacks': member_attacks,
+            'member_raid_idx': raid_idx,
+            'tag_vocab': np.array(list(player_ids), dtype=object)
+        }
+    
     def analyze_contribution_patterns(self,
-                                     raid_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+                                     raid_data: List[Dict[str, Any]],
+                                     soa: Optional[Dict[str, Any]] = None,
+                                     include_profiles: bool = True) -> Dict[str, Any]:
         """
         Analyze individual contribution patterns in capital raids.
         
         Educational: Feature extraction from event data.
         
+        The result always carries `player_columns`: the per-player features
+        as parallel NumPy arrays, which the downstream analyses operate on.
+        The JSON-ready `player_profiles` dicts are only built on request.
+        
+        Args:
+            raid_data: Capital raid seasons
+            soa: Precomputed _to_soa(raid_data) columns
+            include_profiles: Also build the per-player `player_profiles` list
+        
         Returns:
             Per-player contribution profiles
         """
         if not raid_data:
             return {'status': 'no_data'}
         
-        # Aggregate contributions per player across raids
-        player_contributions = defaultdict(lambda: {
-            'total_contributed': 0,
-            'raids_participated': 0,
-            'total_attacks': 0,
-            'total_looted': 0,
-            'contributions_history': []
-        })
-        
-        for raid in raid_data:
-            members = raid.get('member_contributions', [])
-            for member in members:
-                tag = member['tag']
-                contributed = member.get('capital_resources_looted', 0)  # Note: API uses 'looted' for contributions
-                attacks = member.get('attacks', 0)
-                
-                player_contributions[tag]['total_contributed'] += contributed
-                player_contributions[tag]['raids_participated'] += 1
-                player_contributions[tag]['total_attacks'] += attacks
-                player_contributions[tag]['total_looted'] += contributed
-                player_contributions[tag]['contributions_history'].append(contributed)
+        if soa is None:
+            soa = self._to_soa(raid_data)
+        
+        pid = soa['member_pids']
+        contributed = soa['member_contribs']
+        attacks = soa['member_attacks']
+        n_players = soa['tag_vocab'].size
+        
+        if pid.size == 0:
+            return {
+                'players_analyzed': 0,
+                **({'player_profiles': []} if include_profiles else {}),
+                'player_columns': {
+                    'tag': np.empty(0, dtype=object),
+                    'total_contributed': np.empty(0, dtype=np.int64),
+                    'sorted_contributed': np.empty(0),
+                    'avg_contribution': np.empty(0),
+                    'participation_rate': np.empty(0),
+                    'consistency': np.empty(0),
+                    'player_type': np.empty(0, dtype=object),
+                    'total_attacks': np.empty(0, dtype=np.int64)
+                },
+                'raids_analyzed': len(raid_data)
+            }
+        
+        # Per-player reductions
+        raids_participated = np.bincount(pid, minlength=n_players)
+        total_contributed = np.bincount(pid, weights=contributed, minlength=n_players)
+        total_attacks = np.bincount(pid, weights=attacks, minlength=n_players)
+        if contributed.dtype.kind in 'iu':
+            total_contributed = total_contributed.astype(np.int64)
+        if attacks.dtype.kind in 'iu':
+            total_attacks = total_attacks.astype(np.int64)
+        
+        # Compute consistency (inverse of variance), from the population std
+        # of each player's per-raid contributions. Per-player state is just
+        # the bincount sums; the squared deviations reuse one row-sized buffer.
+        mean = total_contributed / np.maximum(raids_participated, 1)
+        sq_dev = contributed - mean[pid]
+        np.square(sq_dev, out=sq_dev)
+        std = np.sqrt(np.bincount(pid, weights=sq_dev, minlength=n_players) /
+                      np.maximum(raids_participated, 1))
+        consistency_col = np.where(
+            raids_participated > 1,
+            1 - np.minimum(std / np.maximum(mean, 1), 1.0),
+            0.5
+        )
+        
+        n_raids = len(raid_data)
+        avg_contribution = total_contributed / np.maximum(raids_participated, 1)
+        participation_rate = raids_participated / n_raids
         
         # Classify contribution types
-        classified_players = []
-        
-        for tag, data in player_contributions.items():
-            avg_contribution = data['total_contributed'] / max(data['raids_participated'], 1)
-            participation_rate = data['raids_participated'] / len(raid_data)
-            
-            # Compute consistency (inverse of variance)
-            if len(data['contributions_history']) > 1:
-                std = float(np.std(data['contributions_history']))
-                mean = float(np.mean(data['contributions_history']))
-                consistency = 1 - min(std / max(mean, 1), 1.0)
-            else:
-                consistency = 0.5
-            
-            # Classify player type
-            if participation_rate < 0.3:
-                player_type = 'inactive'
-            elif avg_contribution < 100:
-                player_type = 'free_rider'
-            elif avg_contribution >= 100 and consistency > 0.6:
-                player_type = 'consistent_contributor'
-            else:
-                player_type = 'irregular_contributor'
-            
-            classified_players.append({
+        player_type = np.select(
+            [
+                participation_rate < 0.3,
+                avg_contribution < 100,
+                consistency_col > 0.6  # avg_contribution >= 100 from here on
+            ],
+            ['inactive', 'free_rider', 'consistent_contributor'],
+            default='irregular_contributor'
+        )
+        
+        player_columns = {
+            'tag': soa['tag_vocab'],
+            'total_contributed': total_contributed,
+            'sorted_contributed': np.sort(total_contributed.astype(np.float64)),
+            'avg_contribution': avg_contribution,
+            'participation_rate': participation_rate,
+            'consistency': consistency_col,
+            'player_type': player_type,
+            'total_attacks': total_attacks
+        }
+        
+        patterns = {'players_analyzed': n_players}
+        if include_profiles:
+            patterns['player_profiles'] = self._profiles_from_columns(player_columns)
+        patterns['player_columns'] = player_columns
+        patterns['raids_analyzed'] = len(raid_data)
+        return patterns
+    
+    def _profiles_from_columns(self, cols: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """
+        Build the JSON-ready per-player profile dicts from the player columns.
+        """
+        return [
+            {
                 'player_tag': tag,
-                'total_contributed': data['total_contributed'],
-                'avg_contribution': avg_contribution,
-                'participation_rate': participation_rate,
+                'total_contributed': total,
+                'avg_contribution': avg,
+                'participation_rate': participation,
                 'consistency': consistency,
-                'player_type': player_type,
-                'total_attacks': data['total_attacks']
-            })
-        
-        return {
-            'players_analyzed': len(classified_players),
-            'player_profiles': classified_players,
-            'raids_analyzed': len(raid_data)
-        }
+                'player_type': kind,
+                'total_attacks': attacks_made
+            }
+            for tag, total, avg, participation, consistency, kind, attacks_made in zip(
+                cols['tag'].tolist(), cols['total_contributed'].tolist(),
+                cols['avg_contribution'].tolist(), cols['participation_rate'].tolist(),
+                cols['consistency'].tolist(), cols['player_type'].tolist(),
+                cols['total_attacks'].tolist())
+        ]
     
     def detect_free_riders(self,
                           contribution_patterns: Dict[str, Any],
@@ -139,37 +305,39 @@ class CapitalInvestmentModel:
         if contribution_patterns.get('status') == 'no_data':
             return []
         
-        players = contribution_patterns['player_profiles']
+        cols = contribution_patterns['player_columns']
+        contrib = cols['total_contributed'].astype(np.float64)
+        participation = cols['participation_rate']
         
-        # Compute contribution distribution
-        contributions = [p['total_contributed'] for p in players if p['participation_rate'] > 0.3]
-        
-        if not contributions:
+        # Compute contribution distribution over participating players
+        active = participation > 0.3
+        if not active.any():
             return []
         
-        threshold = np.percentile(contributions, threshold_percentile)
-        
-        free_riders = []
-        for player in players:
-            # Free-rider: participates but contributes below threshold
-            if (player['participation_rate'] > 0.3 and 
-                player['total_contributed'] < threshold):
-                
-                free_rider_score = 1 - (player['total_contributed'] / threshold)
-                
-                free_riders.append({
-                    'player_tag': player['player_tag'],
-                    'total_contributed': player['total_contributed'],
-                    'clan_threshold': threshold,
-                    'participation_rate': player['participation_rate'],
-                    'free_rider_score': min(free_rider_score, 1.0),
-                    'player_type': player['player_type']
-                })
+        threshold = _sorted_percentile(np.sort(contrib[active]), threshold_percentile)
+        
+        # Free-rider: participates but contributes below threshold
+        selected = np.flatnonzero(active & (contrib < threshold))
+        scores = np.minimum(1 - contrib[selected] / threshold, 1.0)
         
         # Sort by free-rider score
-        free_riders.sort(key=lambda x: x['free_rider_score'], reverse=True)
+        order = np.argsort(-scores, kind='stable')
         
-        return free_riders
+        ranked = selected[order]
+        return [
+            {
+                'player_tag': tag,
+                'total_contributed': total,
+                'clan_threshold': threshold,
+                'participation_rate': rate,
+                'free_rider_score': score,
+                'player_type': kind
+            }
+            for tag, total, rate, score, kind in zip(
+                cols['tag'][ranked].tolist(), cols['total_contributed'][ranked].tolist(),
+                participation[ranked].tolist(), scores[order].tolist(),
+                cols['player_type'][ranked].tolist())
+        ]
     
     def compute_contribution_inequality(self,
                                        contribution_patterns: Dict[str, Any]) -> Dict[str, Any]:
@@ -187,10 +355,9 @@ class CapitalInvestmentModel:
         if contribution_patterns.get('status') == 'no_data':
             return {'gini': 0, 'interpretation': 'no_data'}
         
-        players = contribution_patterns['player_profiles']
-        contributions = [p['total_contributed'] for p in players]
-        
-        gini = self._compute_gini(contributions)
+        total_contrib, _, _, top_10_pct, gini = _summarize(
+            contribution_patterns['player_columns']['sorted_contributed']
+        )
         
         # Interpret
         if gini < 0.3:
@@ -204,9 +371,6 @@ class CapitalInvestmentModel:
             description = 'High inequality - burden on few players (burnout risk)'
         
         # Also compute top contributor concentration
-        total_contrib = sum(contributions)
-        sorted_contrib = sorted(contributions, reverse=True)
-        top_10_pct = sum(sorted_contrib[:max(1, len(sorted_contrib)//10)])
         top_10_concentration = top_10_pct / total_contrib if total_contrib > 0 else 0
         
         return {
@@ -219,36 +383,41 @@ class CapitalInvestmentModel:
     def _compute_gini(self, values: List[float]) -> float:
         """
         Compute Gini coefficient.
-        """
-        if not values or sum(values) == 0:
-            return 0.0
         
-        sorted_values = sorted([v for v in values if v >= 0])
-        n = len(sorted_values)
-        
-        if n == 0:
+        Negative values are dropped before the kernel runs.
+        """
+        if len(values) < 2:
             return 0.0
-        
-        cumsum = np.cumsum(sorted_values)
-        gini = (2 * sum((i + 1) * val for i, val in enumerate(sorted_values))) / (n * sum(sorted_values)) - (n + 1) / n
-        return max(0, min(float(gini), 1.0))
+        return _summarize(np.sort(np.asarray(values, dtype=np.float64)))[4]
     
     def analyze_raid_outcomes(self,
-                             raid_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+                             raid_data: List[Dict[str, Any]],
+                             soa: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Analyze raid weekend outcomes and metrics.
         
         Educational: Performance measurement.
         
+        Args:
+            raid_data: Capital raid seasons
+            soa: Precomputed _to_soa(raid_data) columns
+        
         Returns:
             Raid success metrics
         """
         if not raid_data:
             return {'status': 'no_data'}
         
-        total_loot = sum(r.get('total_loot', 0) for r in raid_data)
-        total_attacks = sum(r.get('total_attacks', 0) for r in raid_data)
-        avg_loot = total_loot / len(raid_data)
+        if soa is None:
+            soa = self._to_soa(raid_data)
+        
+        n_raids = len(raid_data)
+        loots = soa['loots']
+        attacks = soa['attacks']
+        
+        total_loot = int(loots.sum())
+        total_attacks = int(attacks.sum())
+        avg_loot = total_loot / n_raids
         
         # Efficiency: loot per attack
         if total_attacks > 0:
@@ -256,10 +425,9 @@ class CapitalInvestmentModel:
         else:
             loot_per_attack = 0
         
-        # Success trend
-        if len(raid_data) >= 3:
-            recent_loot = [r.get('total_loot', 0) for r in raid_data[-3:]]
-            trend = 'improving' if recent_loot[-1] > recent_loot[0] else 'declining'
+        # Success trend (last raid vs the one two raids earlier)
+        if n_raids >= 3:
+            trend = 'improving' if loots[-1] > loots[-3] else 'declining'
         else:
             trend = 'insufficient_data'
         
@@ -274,7 +442,9 @@ class CapitalInvestmentModel:
     
     def test_contribution_pattern_hypothesis(self,
                                            raid_data: List[Dict[str, Any]],
-                                           contribution_patterns: Dict[str, Any]) -> Dict[str, Any]:
+                                           contribution_patterns: Dict[str, Any],
+                                           inequality: Optional[Dict[str, Any]] = None,
+                                           outcomes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Test whether contribution patterns predict raid success.
         
@@ -290,6 +460,10 @@ class CapitalInvestmentModel:
         show correlation, not causation. Full causal inference would
         require propensity score matching across multiple clans.
         
+        Args:
+            inequality: Precomputed compute_contribution_inequality() result
+            outcomes: Precomputed analyze_raid_outcomes() result
+        
         Returns:
             Hypothesis test results
         """
@@ -297,19 +471,23 @@ class CapitalInvestmentModel:
             return {'hypothesis': 'insufficient_data'}
         
         # Extract features
-        inequality = self.compute_contribution_inequality(contribution_patterns)
+        if inequality is None:
+            inequality = self.compute_contribution_inequality(contribution_patterns)
         gini = inequality['gini_coefficient']
         
         # Participation rate
-        players = contribution_patterns['player_profiles']
-        avg_participation = float(np.mean([p['participation_rate'] for p in players]))
+        cols = contribution_patterns['player_columns']
+        participation = cols['participation_rate']
+        avg_participation = float(participation.mean()) if participation.size else 0.0
         
         # Consistency
-        consistent_players = sum(1 for p in players if p['player_type'] == 'consistent_contributor')
-        consistency_rate = consistent_players / len(players) if players else 0
+        n_players = cols['player_type'].size
+        consistent_players = int(np.count_nonzero(cols['player_type'] == 'consistent_contributor'))
+        consistency_rate = consistent_players / n_players if n_players else 0
         
         # Outcome: average raid performance
-        outcomes = self.analyze_raid_outcomes(raid_data)
+        if outcomes is None:
+            outcomes = self.analyze_raid_outcomes(raid_data)
         avg_loot = outcomes['average_loot_per_raid']
         
         # Simple correlation analysis
@@ -349,7 +527,9 @@ class CapitalInvestmentModel:
         }
     
     def generate_optimal_contribution_policy(self,
-                                           contribution_patterns: Dict[str, Any]) -> Dict[str, Any]:
+                                           contribution_patterns: Dict[str, Any],
+                                           inequality: Optional[Dict[str, Any]] = None,
+                                           free_riders: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Generate recommendations for optimal contribution policy.
         
@@ -360,19 +540,22 @@ class CapitalInvestmentModel:
         - Participation incentives
         - Free-rider management
         
+        Args:
+            inequality: Precomputed compute_contribution_inequality() result
+            free_riders: Precomputed detect_free_riders() result
+        
         Returns:
             Policy recommendations
         """
         if contribution_patterns.get('status') == 'no_data':
             return {'policy': 'insufficient_data'}
         
-        players = contribution_patterns['player_profiles']
-        inequality = self.compute_contribution_inequality(contribution_patterns)
+        sorted_contributed = contribution_patterns['player_columns']['sorted_contributed']
+        if inequality is None:
+            inequality = self.compute_contribution_inequality(contribution_patterns)
         
         # Compute recommended minimum
-        contributions = [p['total_contributed'] for p in players]
-        median_contribution = float(np.median(contributions))
-        mean_contribution = float(np.mean(contributions))
+        _, mean_contribution, median_contribution, _, _ = _summarize(sorted_contributed)
         
         # Policy recommendations
         policies = []
@@ -394,8 +577,9 @@ class CapitalInvestmentModel:
             })
         
         # 3. Free-rider management
-        free_riders = self.detect_free_riders(contribution_patterns)
-        if len(free_riders) > len(players) * 0.2:  # >20% free-riders
+        if free_riders is None:
+            free_riders = self.detect_free_riders(contribution_patterns)
+        if len(free_riders) > sorted_contributed.size * 0.2:  # >20% free-riders
             policies.append({
                 'policy_type': 'free_rider_management',
                 'recommendation': f"Address {len(free_riders)} low contributors (>{20}% of clan)",
@@ -410,14 +594,26 @@ class CapitalInvestmentModel:
         }
     
     def generate_clan_report(self,
-                           raid_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+                           raid_data: List[Dict[str, Any]],
+                           timestamp: Optional[str] = None,
+                           include_profiles: bool = True) -> Dict[str, Any]:
         """
         Generate comprehensive capital investment analysis.
         
         Main entry point for clan capital analysis.
+        
+        Args:
+            raid_data: Capital raid seasons for one clan
+            timestamp: ISO timestamp to stamp the report with (default: now,
+                UTC); batch callers can share one
+            include_profiles: Embed every player's profile in
+                contribution_analysis (False keeps only the summary counts)
         """
+        # Columnar view of the raids, shared by the analyses below
+        soa = self._to_soa(raid_data)
+        
         # Analyze contribution patterns
-        patterns = self.analyze_contribution_patterns(raid_data)
+        patterns = self.analyze_contribution_patterns(raid_data, soa=soa, include_profiles=False)
         
         # Detect free-riders
         free_riders = self.detect_free_riders(patterns)
@@ -426,18 +622,33 @@ class CapitalInvestmentModel:
         inequality = self.compute_contribution_inequality(patterns)
         
         # Raid outcomes
-        outcomes = self.analyze_raid_outcomes(raid_data)
+        outcomes = self.analyze_raid_outcomes(raid_data, soa=soa)
         
-        # Test hypothesis
-        hypothesis = self.test_contribution_pattern_hypothesis(raid_data, patterns)
+        # Test hypothesis (reusing the analyses above)
+        hypothesis = self.test_contribution_pattern_hypothesis(
+            raid_data, patterns, inequality=inequality, outcomes=outcomes
+        )
         
         # Policy recommendations
-        policy = self.generate_optimal_contribution_policy(patterns)
+        policy = self.generate_optimal_contribution_policy(
+            patterns, inequality=inequality, free_riders=free_riders
+        )
+        
+        # Compact summary, plus the per-player profiles only when asked for
+        if patterns.get('status') == 'no_data':
+            contribution_analysis = patterns
+        else:
+            contribution_analysis = {'players_analyzed': patterns['players_analyzed']}
+            if include_profiles:
+                contribution_analysis['player_profiles'] = self._profiles_from_columns(
+                    patterns['player_columns']
+                )
+            contribution_analysis['raids_analyzed'] = patterns['raids_analyzed']
         
         return {
             'model': self.name,
-            'timestamp': datetime.utcnow().isoformat(),
-            'contribution_analysis': patterns,
+            'timestamp': timestamp or datetime.now(timezone.utc).isoformat(),
+            'contribution_analysis': contribution_analysis,
             'free_riders': {
                 'count': len(free_riders),
                 'top_free_riders': free_riders[:10]
@@ -447,3 +658,46 @@ class CapitalInvestmentModel:
             'hypothesis_test': hypothesis,
             'policy_recommendations': policy
         }
+    
+    def generate_clan_reports(self,
+                            raids_by_clan: Dict[str, List[Dict[str, Any]]],
+                            n_jobs: int = -1,
+                            include_profiles: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate capital reports for many clans, in parallel worker processes.
+        
+        Clans are independent and the model is stateless, so each report
+        runs in its own process; all reports share one timestamp.
+        
+        Args:
+            raids_by_clan: Raid seasons keyed by clan tag
+            n_jobs: Worker processes, joblib-style: 1 runs inline, negative
+                values count back from the CPU count (-1: one per CPU,
+                -2: all but one); 0 is invalid
+            include_profiles: Passed through to generate_clan_report
+        
+        Returns:
+            Reports keyed by clan tag
+        """
+        if n_jobs == 0:
+            raise ValueError("n_jobs must be non-zero (use 1 to run inline, -1 for one worker per CPU)")
+        if n_jobs < 0:
+            n_jobs = max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+        
+        timestamp = datetime.now(timezone.utc).isoformat()
+        clan_tags = list(raids_by_clan)
+        
+        if n_jobs == 1 or len(clan_tags) < 2:
+            return {
+                tag: self.generate_clan_report(raids_by_clan[tag], timestamp, include_profiles)
+                for tag in clan_tags
+            }
+        
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            reports = pool.map(
+                self.generate_clan_report,
+                [raids_by_clan[tag] for tag in clan_tags],
+                repeat(timestamp),
+                repeat(include_profiles)
+            )
+            return dict(zip(clan_tags, reports))
@@ -15,15 +15,127 @@ Educational Value:
 Demonstrates algorithmic fairness, causal inference, and bias detection.
 """
 
+import math
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from collections import defaultdict
 from datetime import datetime
 import logging
-from scipy import stats
+from scipy.special import erfc
+
+from numba_compat import njit, NUMBA_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
+# Expected win rate by war league tier (first word of the league name).
+# Fair matchmaking targets 50% everywhere; higher leagues might match
+# slightly better (more clans to match with) once that is quantified.
+_LEAGUE_EXPECTED_WIN_RATE = {
+    'Champion': 0.5,  # Best matchmaking
+    'Master': 0.5,
+    'Crystal': 0.5
+}
+
+# Win-rate segments as cells of the (is_cwl, is_small) table, cell = 2 * is_cwl + is_small
+_SEGMENT_CELLS = {
+    'all_wars': [0, 1, 2, 3],
+    'regular_wars': [0, 1],
+    'cwl_wars': [2, 3],
+    'small_wars': [1, 3],  # < 15 members
+    'large_wars': [0, 2]  # >= 15 members
+}
+
+# War result encoding, mirrors data_models.WAR_RESULT_CODES
+_RESULT_CODES = {'win': 1, 'tie': 0, 'lose': -1}
+
+
+def _result_codes(wars: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Per-war result codes (win=1, tie/unknown=0, lose=-1).
+    
+    Uses the result_code stored at ingestion; records collected before that
+    field existed fall back to their result string.
+    """
+    return np.fromiter(
+        (war['result_code'] if 'result_code' in war else _RESULT_CODES.get(war.get('result'), 0)
+         for war in wars),
+        dtype=np.int8, count=len(wars)
+    )
+
+
+_SQRT1_2 = math.sqrt(0.5)
+
+
+def _two_sided_pvalue(z: float) -> float:
+    """Two-tailed normal p-value, 2 * P(Z > |z|) = erfc(|z| / sqrt(2))."""
+    return math.erfc(abs(z) * _SQRT1_2)
+
+
+def _zprop_pvalue(wins: int, n: int, p0: float = 0.5) -> Tuple[float, float]:
+    """
+    One-proportion z-test of wins/n against p0 with Yates continuity correction.
+    
+    Z = (|p - p0| - 1/(2n)) / sqrt(p0(1-p0)/n), floored at 0 and signed
+    like (p - p0). Normal approximation to the exact binomial test.
+    
+    Returns:
+        (z, p_value)
+    """
+    diff = wins / n - p0
+    z = max(abs(diff) - 0.5 / n, 0.0) / math.sqrt(p0 * (1 - p0) / n)
+    if diff < 0:
+        z = -z
+    return float(z), _two_sided_pvalue(z)
+
+
+@njit(cache=True)
+def _zprop_pvalues(wins, ns, p0):
+    """
+    _zprop_pvalue over float64 arrays of (wins, n), one test per entry.
+    
+    The two-tailed p-value is erfc(|z| / sqrt(2)) = 2 * P(Z > |z|).
+    n must be positive.
+    
+    Returns:
+        (z, p_values) arrays
+    """
+    n_tests = ns.shape[0]
+    z_out = np.empty(n_tests)
+    p_out = np.empty(n_tests)
+    for i in range(n_tests):
+        n = ns[i]
+        diff = wins[i] / n - p0
+        z = max(abs(diff) - 0.5 / n, 0.0) / math.sqrt(p0 * (1 - p0) / n)
+        z_out[i] = -z if diff < 0 else z
+        p_out[i] = math.erfc(z * _SQRT1_2)
+    return z_out, p_out
+
+
+# Compile at import so the first batch audit doesn't pay JIT cost
+if NUMBA_AVAILABLE:
+    _zprop_pvalues(np.ones(2), np.full(2, 2.0), 0.5)
+
+
+def _pooled_ztests(wins_a: np.ndarray, n_a: np.ndarray,
+                   wins_b: np.ndarray, n_b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized two-proportion z-tests (pooled standard error).
+    
+    Entries with a zero standard error get z = 0, p = 1. n_a and n_b must be
+    positive.
+    """
+    rate_a = wins_a / n_a
+    rate_b = wins_b / n_b
+    pooled_p = (wins_a + wins_b) / (n_a + n_b)
+    se = np.sqrt(pooled_p * (1 - pooled_p) * (1 / n_a + 1 / n_b))
+    
+    ok = se > 0
+    z = np.zeros_like(se)
+    z[ok] = (rate_a[ok] - rate_b[ok]) / se[ok]
+    p_values = np.ones_like(se)
+    p_values[ok] = erfc(np.abs(z[ok]) * _SQRT1_2)
+    return z, p_values
+
 
 class MatchmakingFairnessModel:
     """
@@ -50,7 +162,8 @@ class MatchmakingFairnessModel:
     
     def compute_win_rates_by_characteristics(self,
                                             wars: List[Dict[str, Any]],
-                                            clan_snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+                                            clan_snapshots: List[Dict[str, Any]],
+                                            segments: Tuple[str, ...] = tuple(_SEGMENT_CELLS)) -> Dict[str, Any]:
         """
         Compute win rates segmented by clan characteristics.
         
@@ -62,6 +175,13 @@ class MatchmakingFairnessModel:
         - War win streak (hot, cold, neutral)
         - Member count (full, partial)
         
+        Args:
+            wars: War records
+            clan_snapshots: Clan snapshots (latest one used for characteristics)
+            segments: Segments to report, from all_wars, regular_wars,
+                cwl_wars, small_wars and large_wars (default: all). The
+                team-size pass is skipped unless small/large is requested.
+        
         Returns:
             Win rates by segment
         """
@@ -71,41 +191,30 @@ class MatchmakingFairnessModel:
         # Get latest clan snapshot for characteristics
         latest_clan = clan_snapshots[-1]
         
-        # Segment wars
-        segments = {
-            'all_wars': [],
-            'regular_wars': [],
-            'cwl_wars': [],
-            'small_wars': [],  # < 15 members
-            'large_wars': []  # >= 15 members
-        }
-        
-        for war in wars:
-            result = war.get('result', 'unknown')
-            team_size = war.get('team_size', 0)
-            is_cwl = war.get('is_cwl', False)
-            
-            segments['all_wars'].append(result)
-            
-            if is_cwl:
-                segments['cwl_wars'].append(result)
-            else:
-                segments['regular_wars'].append(result)
-            
-            if team_size < 15:
-                segments['small_wars'].append(result)
-            else:
-                segments['large_wars'].append(result)
+        # Tabulate wars by (segment cell, result) in one bincount: cell is
+        # 2 * is_cwl + is_small, result column is result_code + 1 (lose/tie/win)
+        n_wars = len(wars)
+        is_cwl = np.fromiter((bool(war.get('is_cwl', False)) for war in wars),
+                             dtype=bool, count=n_wars)
+        cells = 2 * is_cwl.astype(np.intp)
+        if 'small_wars' in segments or 'large_wars' in segments:
+            cells += np.fromiter((war.get('team_size', 0) < 15 for war in wars),
+                                 dtype=bool, count=n_wars)
+        table = np.bincount(3 * cells + _result_codes(wars) + 1, minlength=12).reshape(4, 3)
+        cell_totals = table.sum(axis=1)
+        cell_wins = table[:, 2]
         
         # Compute win rates
         win_rates = {}
-        for segment_name, results in segments.items():
-            if results:
-                wins = sum(1 for r in results if r == 'win')
-                win_rate = wins / len(results)
+        for segment_name in segments:
+            segment_cells = _SEGMENT_CELLS[segment_name]
+            total = int(cell_totals[segment_cells].sum())
+            wins = int(cell_wins[segment_cells].sum())
+            
+            if total:
                 win_rates[segment_name] = {
-                    'win_rate': float(win_rate),
-                    'total_wars': len(results),
+                    'win_rate': float(wins / total),
+                    'total_wars': total,
                     'wins': wins
                 }
             else:
@@ -130,26 +239,16 @@ class MatchmakingFairnessModel:
         Returns:
             Expected win rate (0-1)
         """
-        # In fair matchmaking, expected win rate should be 0.5
-        # Adjust slightly based on league (higher league = slightly better matchmaking)
-        
-        war_league = clan_characteristics.get('war_league', '')
-        
-        # Baseline: 50%
-        expected = 0.5
+        # In fair matchmaking, expected win rate should be 0.5 (the baseline);
+        # the league tier table allows per-tier adjustment
+        war_league = clan_characteristics.get('war_league') or ''
+        league_tier = war_league.split(' ', 1)[0]
         
-        # Higher leagues might have slightly better matchmaking (more clans to match with)
-        if 'Champion' in war_league:
-            expected = 0.5  # Best matchmaking
-        elif 'Master' in war_league:
-            expected = 0.5
-        elif 'Crystal' in war_league:
-            expected = 0.5
-        
-        return expected
+        return _LEAGUE_EXPECTED_WIN_RATE.get(league_tier, 0.5)
     
     def test_demographic_parity(self,
-                               win_rates: Dict[str, Any]) -> Dict[str, Any]:
+                               win_rates: Dict[str, Any],
+                               z_test: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
         """
         Test for demographic parity across war types.
         
@@ -160,6 +259,11 @@ class MatchmakingFairnessModel:
         If regular wars and CWL have significantly different win rates,
         matchmaking may be biased toward one type.
         
+        Args:
+            win_rates: Output of compute_win_rates_by_characteristics
+            z_test: Precomputed (z, p_value) of the regular-vs-CWL test
+                (batched by generate_fairness_reports)
+        
         Returns:
             Parity test results
         """
@@ -180,23 +284,26 @@ class MatchmakingFairnessModel:
                 'cwl_win_rate': cwl_wr
             }
         
-        # Two-proportion z-test
-        regular_wins = win_rates.get('regular_wars', {}).get('wins', 0)
-        cwl_wins = win_rates.get('cwl_wars', {}).get('wins', 0)
-        
-        # Pooled proportion
-        pooled_p = (regular_wins + cwl_wins) / (regular_n + cwl_n)
-        
-        # Standard error
-        se = np.sqrt(pooled_p * (1 - pooled_p) * (1/regular_n + 1/cwl_n))
-        
-        # Z-statistic
-        if se > 0:
-            z = (regular_wr - cwl_wr) / se
-            p_value = 2 * (1 - stats.norm.cdf(abs(z)))  # Two-tailed
+        if z_test is not None:
+            z, p_value = z_test
         else:
-            z = 0
-            p_value = 1.0
+            # Two-proportion z-test
+            regular_wins = win_rates.get('regular_wars', {}).get('wins', 0)
+            cwl_wins = win_rates.get('cwl_wars', {}).get('wins', 0)
+            
+            # Pooled proportion
+            pooled_p = (regular_wins + cwl_wins) / (regular_n + cwl_n)
+            
+            # Standard error
+            se = np.sqrt(pooled_p * (1 - pooled_p) * (1/regular_n + 1/cwl_n))
+            
+            # Z-statistic
+            if se > 0:
+                z = (regular_wr - cwl_wr) / se
+                p_value = _two_sided_pvalue(z)  # Two-tailed
+            else:
+                z = 0
+                p_value = 1.0
         
         # Interpret
         if p_value < 0.05:
@@ -286,7 +393,8 @@ class MatchmakingFairnessModel:
     
     def detect_matchmaking_bias(self,
                                win_rates: Dict[str, Any],
-                               matchup_difficulty: Dict[str, Any]) -> Dict[str, Any]:
+                               matchup_difficulty: Dict[str, Any],
+                               p_value: Optional[float] = None) -> Dict[str, Any]:
         """
         Overall bias detection combining multiple signals.
         
@@ -297,6 +405,12 @@ class MatchmakingFairnessModel:
         2. Systematic difficulty imbalance
         3. Demographic parity violations
         
+        Args:
+            win_rates: Output of compute_win_rates_by_characteristics
+            matchup_difficulty: Output of compute_matchup_difficulty
+            p_value: Precomputed p-value of the overall win rate vs 50%
+                (batched by generate_fairness_reports)
+        
         Returns:
             Bias assessment
         """
@@ -313,10 +427,11 @@ class MatchmakingFairnessModel:
             }
         
         # Test if win rate significantly different from 50%
-        wins = win_rates.get('all_wars', {}).get('wins', 0)
-        
-        # Binomial test
-        p_value = float(stats.binom_test(wins, total_wars, 0.5, alternative='two-sided'))
+        if p_value is None:
+            wins = win_rates.get('all_wars', {}).get('wins', 0)
+            
+            # Continuity-corrected z-test (normal approximation to the binomial test)
+            _, p_value = _zprop_pvalue(wins, total_wars, 0.5)
         
         # Combine with difficulty
         difficulty = matchup_difficulty.get('average_difficulty', 0.5)
@@ -359,33 +474,50 @@ class MatchmakingFairnessModel:
     
     def generate_fairness_report(self,
                                 wars: List[Dict[str, Any]],
-                                clan_snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+                                clan_snapshots: List[Dict[str, Any]],
+                                timestamp: Optional[str] = None,
+                                win_rates: Optional[Dict[str, Any]] = None,
+                                difficulty: Optional[Dict[str, Any]] = None,
+                                parity_test: Optional[Tuple[float, float]] = None,
+                                bias_p_value: Optional[float] = None) -> Dict[str, Any]:
         """
         Generate comprehensive matchmaking fairness report.
         
-        Main entry point for fairness audit.
+        Main entry point for fairness audit. The optional arguments carry
+        pieces generate_fairness_reports has already computed for the clan.
         """
+        timestamp = timestamp or datetime.utcnow().isoformat()
+        
+        # Every sub-analysis needs wars and a clan snapshot; answer once
+        if not wars or not clan_snapshots:
+            return {
+                'model': self.name,
+                'timestamp': timestamp,
+                'status': 'insufficient_data',
+                'overall_grade': {'grade': 'N/A', 'description': 'Insufficient data'},
+                'wars_analyzed': len(wars)
+            }
+        
         # Win rates by characteristics
-        win_rates = self.compute_win_rates_by_characteristics(wars, clan_snapshots)
+        if win_rates is None:
+            win_rates = self.compute_win_rates_by_characteristics(wars, clan_snapshots)
         
         # Expected win rate
-        if clan_snapshots:
-            expected_wr = self.compute_expected_win_rate(clan_snapshots[-1])
-        else:
-            expected_wr = 0.5
+        expected_wr = self.compute_expected_win_rate(clan_snapshots[-1])
         
         # Demographic parity test
-        parity = self.test_demographic_parity(win_rates)
+        parity = self.test_demographic_parity(win_rates, parity_test)
         
         # Matchup difficulty
-        difficulty = self.compute_matchup_difficulty(wars)
+        if difficulty is None:
+            difficulty = self.compute_matchup_difficulty(wars)
         
         # Bias detection
-        bias = self.detect_matchmaking_bias(win_rates, difficulty)
+        bias = self.detect_matchmaking_bias(win_rates, difficulty, bias_p_value)
         
         return {
             'model': self.name,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': timestamp,
             'win_rates': win_rates,
             'expected_win_rate': expected_wr,
             'demographic_parity': parity,
@@ -395,6 +527,72 @@ class MatchmakingFairnessModel:
             'wars_analyzed': len(wars)
         }
     
+    def generate_fairness_reports(self,
+                                 wars_by_clan: Dict[str, List[Dict[str, Any]]],
+                                 snapshots_by_clan: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate fairness reports for many clans at once (e.g. an audit of
+        every tracked clan).
+        
+        Win rates and difficulty are tabulated per clan; the significance
+        tests then run as single vectorized erfc calls across all clans
+        instead of one SciPy call per clan. All reports share one timestamp.
+        
+        Args:
+            wars_by_clan: War records keyed by clan tag
+            snapshots_by_clan: Clan snapshots keyed by clan tag
+        
+        Returns:
+            Reports keyed by clan tag (same order as wars_by_clan)
+        """
+        timestamp = datetime.utcnow().isoformat()
+        
+        clans = []
+        for tag, wars in wars_by_clan.items():
+            clan_snapshots = snapshots_by_clan.get(tag, [])
+            if wars and clan_snapshots:
+                clans.append((
+                    tag, wars, clan_snapshots,
+                    self.compute_win_rates_by_characteristics(wars, clan_snapshots),
+                    self.compute_matchup_difficulty(wars)
+                ))
+        
+        def column(segment: str, field: str) -> np.ndarray:
+            return np.array([clan[3][segment][field] for clan in clans], dtype=np.float64)
+        
+        # Overall win rate vs 50% (every clan here has at least one war)
+        _, bias_p = _zprop_pvalues(column('all_wars', 'wins'), column('all_wars', 'total_wars'), 0.5)
+        
+        # Regular vs CWL parity, only where both samples are large enough
+        regular_n, cwl_n = column('regular_wars', 'total_wars'), column('cwl_wars', 'total_wars')
+        testable = (regular_n >= 5) & (cwl_n >= 5)
+        parity_z = np.zeros(len(clans))
+        parity_p = np.ones(len(clans))
+        parity_z[testable], parity_p[testable] = _pooled_ztests(
+            column('regular_wars', 'wins')[testable], regular_n[testable],
+            column('cwl_wars', 'wins')[testable], cwl_n[testable]
+        )
+        
+        tested = {clan[0]: i for i, clan in enumerate(clans)}
+        reports = {}
+        for tag, wars in wars_by_clan.items():
+            i = tested.get(tag)
+            if i is None:
+                # No wars or no snapshot: the insufficient-data report
+                reports[tag] = self.generate_fairness_report(wars, snapshots_by_clan.get(tag, []), timestamp)
+                continue
+            
+            _, _, clan_snapshots, win_rates, difficulty = clans[i]
+            reports[tag] = self.generate_fairness_report(
+                wars, clan_snapshots, timestamp,
+                win_rates=win_rates,
+                difficulty=difficulty,
+                parity_test=(float(parity_z[i]), float(parity_p[i])),
+                bias_p_value=float(bias_p[i])
+            )
+        
+        return reports
+    
     def _compute_fairness_grade(self, bias: Dict[str, Any]) -> Dict[str, str]:
         """
         Assign fairness grade to matchmaking.
@@ -0,0 +1,37 @@
+"""
+Optional Numba JIT Support
+
+Numba is an optional dependency. When it is installed, the numeric kernels
+in the ML modules are compiled to native code; when it is missing, `njit`
+degrades to a no-op decorator and `prange` to `range`, so the same kernels
+run as plain Python/NumPy.
+
+Usage:
+    from numba_compat import njit, NUMBA_AVAILABLE
+
+    @njit(cache=True)
+    def _kernel(arr):
+        ...
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and called forms)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+    logger.debug("Numba not installed - ML kernels run in pure Python/NumPy mode")
@@ -21,25 +21,46 @@ This server demonstrates production ML deployment patterns:
 - Comprehensive error handling
 """
 
-from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks, Request, Response
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+from collections import defaultdict
 from datetime import datetime, timedelta
 import os
 import logging
 import asyncio
+import functools
+import hashlib
+import json
+import multiprocessing
+import time
 from pathlib import Path
+from urllib.parse import unquote
+from concurrent.futures import ProcessPoolExecutor
+import bson
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional dependency
+    aioredis = None
+
+try:
+    import orjson  # noqa: F401  (ORJSONResponse needs it installed)
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:  # optional dependency
+    DefaultResponse = JSONResponse
 
 # Import our ML modules
 from ml_module_1_leadership import LeadershipEntropyModel
 from ml_module_2_pressure import PressureFunctionModel
 from ml_module_3_coordination import CoordinationModel
-from ml_module_4_volatility import TrophyVolatilityModel
-from ml_module_5_donations import DonationNetworkModel
+from ml_module_4_volatility import TrophyVolatilityModel, TrophySeries
+from ml_module_5_donations import DonationNetworkModel, normalize_snapshot
 from ml_module_6_capital import CapitalInvestmentModel
 from ml_module_7_fairness import MatchmakingFairnessModel
 
@@ -62,24 +83,67 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
-# Initialize ML models
+# Optional Redis hot layer for recent snapshot windows (enabled by REDIS_URL)
+redis_url = os.environ.get('REDIS_URL', '')
+redis_client = aioredis.from_url(redis_url) if aioredis is not None and redis_url else None
+if redis_url and aioredis is None:
+    logger.warning("REDIS_URL is set but the redis package is not installed - Redis cache disabled")
+
+# Initialize ML models (stateless singletons, referenced directly by the endpoints)
+LEADERSHIP_MODEL = LeadershipEntropyModel()
+PRESSURE_MODEL = PressureFunctionModel()
+COORDINATION_MODEL = CoordinationModel()
+VOLATILITY_MODEL = TrophyVolatilityModel()
+DONATIONS_MODEL = DonationNetworkModel()
+CAPITAL_MODEL = CapitalInvestmentModel()
+FAIRNESS_MODEL = MatchmakingFairnessModel()
+
 ml_models = {
-    'leadership': LeadershipEntropyModel(),
-    'pressure': PressureFunctionModel(),
-    'coordination': CoordinationModel(),
-    'volatility': TrophyVolatilityModel(),
-    'donations': DonationNetworkModel(),
-    'capital': CapitalInvestmentModel(),
-    'fairness': MatchmakingFairnessModel()
+    'leadership': LEADERSHIP_MODEL,
+    'pressure': PRESSURE_MODEL,
+    'coordination': COORDINATION_MODEL,
+    'volatility': VOLATILITY_MODEL,
+    'donations': DONATIONS_MODEL,
+    'capital': CAPITAL_MODEL,
+    'fairness': FAIRNESS_MODEL
+}
+
+# Mongo projections: fetch only the fields each ML model reads
+# Leadership and donation analyses share one players_history fetch, so this
+# is the union of the fields both models read
+CLAN_PLAYER_FIELDS = {
+    "_id": 0, "player_tag": 1, "name": 1, "clan_tag": 1, "clan_role": 1,
+    "snapshot_time": 1, "trophies": 1, "donations": 1, "donations_received": 1
+}
+LEADERSHIP_ATTACK_FIELDS = {"_id": 0, "attacker_tag": 1}
+LEADERSHIP_CLAN_FIELDS = {"_id": 0, "snapshot_time": 1, "member_tags": 1}
+PRESSURE_ATTACK_FIELDS = {"_id": 0, "attacker_tag": 1, "war_id": 1, "stars": 1, "attack_order": 1}
+FAIRNESS_WAR_FIELDS = {
+    "_id": 0, "result": 1, "result_code": 1, "team_size": 1, "is_cwl": 1,
+    "clan_stars": 1, "opponent_stars": 1
+}
+FAIRNESS_CLAN_FIELDS = {"_id": 0, "snapshot_time": 1, "war_league": 1}
+COORDINATION_ATTACK_FIELDS = {
+    "_id": 0, "attack_time": 1, "attack_order": 1, "defender_tag": 1,
+    "attacker_th_level": 1, "defender_th_level": 1
+}
+VOLATILITY_PLAYER_FIELDS = {"_id": 0, "snapshot_time": 1, "trophies": 1}
+CAPITAL_RAID_FIELDS = {
+    "_id": 0, "total_loot": 1, "total_attacks": 1,
+    "member_contributions.tag": 1,
+    "member_contributions.capital_resources_looted": 1,
+    "member_contributions.attacks": 1
 }
 
 # Initialize CoC API client
 coc_api_key = os.environ.get('COC_API_KEY', '')
 coc_client = CoCAPIClient(coc_api_key) if coc_api_key else None
-data_collector = DataCollector(db, coc_api_key) if coc_api_key else None
+data_collector = DataCollector(db, coc_api_key, redis_client) if coc_api_key else None
 
 # Create the main app
-app = FastAPI(title="Clash of Clans ML Research Platform")
+# Responses are large nested report dicts; orjson serializes them much faster
+# than the stdlib json JSONResponse uses
+app = FastAPI(title="Clash of Clans ML Research Platform", default_response_class=DefaultResponse)
 
 # Create API router
 api_router = APIRouter(prefix="/api")
@@ -98,6 +162,170 @@ class MLAnalysisRequest(BaseModel):
     war_id: Optional[str] = None
     force_refresh: bool = False
 
+class MLBatchAnalysisRequest(BaseModel):
+    clan_tag: str
+    kinds: List[str] = ['leadership', 'donations', 'capital', 'fairness']
+
+
+# ============================================================================
+# IN-PROCESS RESULT CACHE
+# ============================================================================
+
+# Identical analyze_* requests within this window (dashboard fan-out, refresh
+# bursts) are answered from memory instead of re-reading Mongo and re-running
+# the model
+ANALYSIS_CACHE_TTL_SECONDS = 300
+ANALYSIS_CACHE_MAXSIZE = 1024
+
+# (endpoint, entity tag, data generation) -> (expires_at, task)
+_analysis_cache: Dict[tuple, tuple] = {}
+
+
+async def _data_generation(tag: str) -> int:
+    """
+    Collector generation of a tag; changes whenever new data is stored for it.
+    
+    With Redis this is the shared `gen:{tag}` counter the collector bumps, so
+    every worker (and a restarted process) sees a collection pass; without
+    it, only the collector's own in-memory counter is available.
+    """
+    if redis_client is not None:
+        try:
+            return int(await redis_client.get(f"gen:{tag}") or 0)
+        except Exception as e:
+            logger.warning(f"Redis generation read failed for {tag}: {e}")
+    return data_collector.data_generation.get(tag, 0) if data_collector else 0
+
+
+def _evict_analysis_cache(now: float):
+    """Drop expired entries, then the oldest ones until there is room for one more."""
+    for key in [k for k, (expires_at, _) in _analysis_cache.items() if expires_at <= now]:
+        del _analysis_cache[key]
+    while len(_analysis_cache) >= ANALYSIS_CACHE_MAXSIZE:
+        del _analysis_cache[next(iter(_analysis_cache))]
+
+
+async def cached_analysis(key: tuple, compute, refresh: bool = False):
+    """
+    Return the memoized result for `key`, computing it on a miss.
+    
+    The entry holds the computing task itself, so concurrent callers for the
+    same key await one computation instead of each running their own
+    (single-flight). Failed computations (e.g. 404 for missing data) are not
+    cached.
+    """
+    now = time.monotonic()
+    entry = _analysis_cache.get(key)
+    if entry is None or entry[0] <= now or refresh:
+        if len(_analysis_cache) >= ANALYSIS_CACHE_MAXSIZE:
+            _evict_analysis_cache(now)
+        task = asyncio.ensure_future(compute())
+        entry = (now + ANALYSIS_CACHE_TTL_SECONDS, task)
+        _analysis_cache[key] = entry
+        
+        def _drop_failed(done, key=key, entry=entry):
+            if (done.cancelled() or done.exception() is not None) and _analysis_cache.get(key) is entry:
+                del _analysis_cache[key]
+        task.add_done_callback(_drop_failed)
+    
+    # Shield so a disconnecting caller doesn't cancel the computation shared
+    # with the other waiters
+    return await asyncio.shield(entry[1])
+
+
+# key -> task of a computation currently running (removed once it finishes)
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+async def coalesce(key: tuple, compute):
+    """
+    Single-flight: concurrent callers with the same key share one running
+    `compute()` instead of each starting their own. Nothing is kept once it
+    finishes.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(compute())
+        _inflight[key] = task
+        task.add_done_callback(lambda _, key=key: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+def memoize_analysis(endpoint: str):
+    """
+    Decorator caching an analysis `impl(tag, ...)` per (endpoint, tag).
+    
+    The key includes the data generation of the tag, so results computed
+    before a new collection pass are not served afterwards. Without Redis
+    that generation is per-process: workers other than the collector's keep
+    serving older results until the TTL expires.
+    `force_refresh=True` bypasses (and replaces) the cached entry.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(tag: str, **kwargs):
+            key = (endpoint, tag, await _data_generation(tag))
+            return await cached_analysis(
+                key, lambda: func(tag, **kwargs), refresh=kwargs.get('force_refresh', False)
+            )
+        return wrapper
+    return decorator
+
+
+# CPU-bound model calls run in worker processes so they don't block the event
+# loop (and the dashboard's concurrent analyses use all cores). ML_WORKERS=0
+# runs them inline; unset means one worker per CPU.
+ML_WORKERS = int(os.environ.get('ML_WORKERS', os.cpu_count() or 1))
+ml_executor: Optional[ProcessPoolExecutor] = None
+
+
+async def run_model(func, *args, **kwargs):
+    """Run a model method in the ML process pool (inline when it is disabled)."""
+    if ml_executor is None:
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ml_executor, functools.partial(func, *args, **kwargs))
+
+
+# Raw snapshot windows only change once per collection pass, so they can sit
+# in Redis for a whole collection interval
+SNAPSHOT_CACHE_TTL_SECONDS = 6 * 3600
+
+
+async def cached_find(key: str, tag: str, loader) -> List[Dict[str, Any]]:
+    """
+    Fetch a list of documents through the Redis hot layer.
+    
+    On a hit the rows come back from one Redis blob instead of a Mongo
+    cursor; on a miss `loader()` runs the Mongo query and the result is
+    stored. The key carries the generation of `tag` kept in Redis
+    (`gen:{tag}`, bumped by the collector), so a new collection pass in any
+    process switches every worker to fresh entries, across restarts too
+    (old ones expire by TTL).
+    Without Redis, or if Redis errors, this is just `await loader()`.
+    Rows are stored as BSON, which keeps their datetimes intact (JSON
+    would not).
+    """
+    if redis_client is None:
+        return await loader()
+    
+    try:
+        generation = await redis_client.get(f"gen:{tag}")
+        key = f"{key}:{int(generation or 0)}"
+        blob = await redis_client.get(key)
+        if blob is not None:
+            return bson.decode(blob)['rows']
+    except Exception as e:
+        logger.warning(f"Redis read failed for {key}: {e}")
+        return await loader()
+    
+    rows = await loader()
+    try:
+        await redis_client.setex(key, SNAPSHOT_CACHE_TTL_SECONDS, bson.encode({'rows': rows}))
+    except Exception as e:
+        logger.warning(f"Redis write failed for {key}: {e}")
+    return rows
+
 
 # ============================================================================
 # DATA COLLECTION ENDPOINTS
@@ -212,26 +440,28 @@ async def get_clan_data_stats(clan_tag: str):
     Shows how much historical data is available for ML models.
     """
     # URL decode the clan tag (FastAPI already decodes %23 to #)
-    from urllib.parse import unquote
     clan_tag = unquote(clan_tag)
     if not clan_tag.startswith('#'):
         clan_tag = '#' + clan_tag
     
-    # Count snapshots
-    player_snapshots = await db.players_history.count_documents({"clan_tag": clan_tag})
-    clan_snapshots = await db.clans_history.count_documents({"clan_tag": clan_tag})
-    wars = await db.wars_history.count_documents({"clan_tag": clan_tag})
-    war_attacks = await db.war_attacks.count_documents({"clan_tag": clan_tag})
-    capital_raids = await db.capital_raids_history.count_documents({"clan_tag": clan_tag})
-    
-    # Get date range
-    oldest_clan = await db.clans_history.find_one(
-        {"clan_tag": clan_tag},
-        sort=[("snapshot_time", 1)]
-    )
-    latest_clan = await db.clans_history.find_one(
-        {"clan_tag": clan_tag},
-        sort=[("snapshot_time", -1)]
+    # Count snapshots and get date range (independent queries, run concurrently)
+    (player_snapshots, clan_snapshots, wars, war_attacks, capital_raids,
+     oldest_clan, latest_clan) = await asyncio.gather(
+        db.players_history.count_documents({"clan_tag": clan_tag}),
+        db.clans_history.count_documents({"clan_tag": clan_tag}),
+        db.wars_history.count_documents({"clan_tag": clan_tag}),
+        db.war_attacks.count_documents({"clan_tag": clan_tag}),
+        db.capital_raids_history.count_documents({"clan_tag": clan_tag}),
+        db.clans_history.find_one(
+            {"clan_tag": clan_tag},
+            {"_id": 0, "snapshot_time": 1},
+            sort=[("snapshot_time", 1)]
+        ),
+        db.clans_history.find_one(
+            {"clan_tag": clan_tag},
+            {"_id": 0, "snapshot_time": 1},
+            sort=[("snapshot_time", -1)]
+        )
     )
     
     if oldest_clan and latest_clan:
@@ -261,98 +491,115 @@ async def get_clan_data_stats(clan_tag: str):
     }
 
 
+async def fetch_clan_player_snapshots(clan_tag: str) -> List[Dict[str, Any]]:
+    """
+    A clan's player snapshots, shared by the leadership and donation analyses.
+    
+    Concurrent callers (the dashboard runs both analyses at once) share one
+    in-flight query, which also goes through the Redis hot layer.
+    """
+    return await coalesce(
+        ("players_history", clan_tag),
+        lambda: cached_find(
+            f"ph:{clan_tag}", clan_tag,
+            lambda: db.players_history.find({"clan_tag": clan_tag}, CLAN_PLAYER_FIELDS).to_list(10000)
+        )
+    )
+
+
 # ============================================================================
 # ML MODULE 1: LEADERSHIP ENTROPY
 # ============================================================================
 
-@api_router.post("/ml/leadership/analyze")
-async def analyze_leadership(request: MLAnalysisRequest):
-    """
-    Analyze clan leadership structure using entropy modeling.
-    
-    Returns:
-    - Leadership influence scores per member
-    - Organizational entropy metrics
-    - Stability predictions
-    
-    Educational: Demonstrates latent variable modeling and social network analysis.
-    """
-    if not request.clan_tag:
-        raise HTTPException(status_code=400, detail="clan_tag required")
-    
-    clan_tag = request.clan_tag
+@memoize_analysis("leadership")
+async def _leadership_impl(clan_tag: str, force_refresh: bool = False) -> Dict[str, Any]:
+    """Leadership entropy report for a clan (24h Mongo cache unless force_refresh)."""
+    now = datetime.utcnow()
     
     # Check cache unless force refresh
-    if not request.force_refresh:
+    if not force_refresh:
         cached = await db.ml_results.find_one({
             "model_name": "leadership_entropy",
             "entity_id": clan_tag,
-            "valid_until": {"$gt": datetime.utcnow()}
+            "valid_until": {"$gt": now}
         })
         if cached:
             return cached['results']
     
-    # Fetch data
-    player_snapshots = await db.players_history.find({"clan_tag": clan_tag}).to_list(10000)
-    war_attacks = await db.war_attacks.find({"clan_tag": clan_tag}).to_list(5000)
-    clan_snapshots = await db.clans_history.find({"clan_tag": clan_tag}).to_list(1000)
+    # Fetch data (independent queries, run concurrently). The model only
+    # reads the latest clan snapshot, so fetch just that one.
+    player_snapshots, war_attacks, latest_clan = await asyncio.gather(
+        fetch_clan_player_snapshots(clan_tag),
+        db.war_attacks.find({"clan_tag": clan_tag}, LEADERSHIP_ATTACK_FIELDS).to_list(5000),
+        db.clans_history.find_one(
+            {"clan_tag": clan_tag},
+            LEADERSHIP_CLAN_FIELDS,
+            sort=[("snapshot_time", -1)]
+        )
+    )
+    clan_snapshots = [latest_clan] if latest_clan is not None else []
     
     if not player_snapshots or not clan_snapshots:
         raise HTTPException(status_code=404, detail="Insufficient data for analysis. Clan may need more collection time.")
     
     # Run ML model
-    model = ml_models['leadership']
-    results = model.generate_report(player_snapshots, war_attacks, clan_snapshots)
+    model = LEADERSHIP_MODEL
+    results = await run_model(model.generate_report, player_snapshots, war_attacks, clan_snapshots)
     
     # Cache results for 24 hours
     await db.ml_results.insert_one({
         "model_name": "leadership_entropy",
         "entity_type": "clan",
         "entity_id": clan_tag,
-        "computed_at": datetime.utcnow(),
-        "valid_until": datetime.utcnow() + timedelta(hours=24),
+        "computed_at": now,
+        "valid_until": now + timedelta(hours=24),
         "results": results,
         "data_points_used": len(player_snapshots)
     })
     
     return results
 
-
-# ============================================================================
-# ML MODULE 2: PRESSURE FUNCTION
-# ============================================================================
-
-@api_router.post("/ml/pressure/analyze-player")
-async def analyze_player_pressure(request: MLAnalysisRequest):
+@api_router.post("/ml/leadership/analyze")
+async def analyze_leadership(request: MLAnalysisRequest):
     """
-    Analyze individual player performance under pressure.
+    Analyze clan leadership structure using entropy modeling.
     
     Returns:
-    - Baseline performance metrics
-    - Pressure sensitivity coefficient
-    - Choking probability
-    - Reliability score
-    - Player archetype
+    - Leadership influence scores per member
+    - Organizational entropy metrics
+    - Stability predictions
     
-    Educational: Demonstrates variance modeling and contextual performance analysis.
+    Educational: Demonstrates latent variable modeling and social network analysis.
     """
-    if not request.player_tag:
-        raise HTTPException(status_code=400, detail="player_tag required")
-    
-    player_tag = request.player_tag
+    if not request.clan_tag:
+        raise HTTPException(status_code=400, detail="clan_tag required")
     
+    return await _leadership_impl(request.clan_tag, force_refresh=request.force_refresh)
+
+
+# ============================================================================
+# ML MODULE 2: PRESSURE FUNCTION
+# ============================================================================
+
+@memoize_analysis("pressure_player")
+async def _player_pressure_impl(player_tag: str) -> Dict[str, Any]:
+    """Pressure report for one player."""
     # Fetch player's attacks
-    attacks = await db.war_attacks.find({"attacker_tag": player_tag}).to_list(1000)
+    attacks = await db.war_attacks.find(
+        {"attacker_tag": player_tag}, PRESSURE_ATTACK_FIELDS
+    ).to_list(1000)
     
     if not attacks:
         raise HTTPException(status_code=404, detail="No attack data found for player")
     
-    # Get war contexts
-    war_ids = list(set(a['war_id'] for a in attacks))
+    # Get war contexts (group attacks by war in one pass)
+    attacks_by_war = defaultdict(list)
+    for attack in attacks:
+        attacks_by_war[attack['war_id']].append(attack)
+    
     war_contexts = []
-    for war_id in war_ids:
+    for war_id, war_attacks in attacks_by_war.items():
         # Compute war context from attacks
-        war_attacks = [a for a in attacks if a['war_id'] == war_id]
         our_stars = sum(a['stars'] for a in war_attacks)
         context = {
             'war_id': war_id,
@@ -364,42 +611,50 @@ async def analyze_player_pressure(request: MLAnalysisRequest):
         war_contexts.append(context)
     
     # Run ML model
-    model = ml_models['pressure']
-    results = model.generate_player_report(player_tag, attacks, war_contexts)
+    model = PRESSURE_MODEL
+    results = await run_model(model.generate_player_report, player_tag, attacks, war_contexts)
     
     return results
 
-@api_router.post("/ml/pressure/analyze-clan")
-async def analyze_clan_pressure(request: MLAnalysisRequest):
-    """
-    Analyze clan-wide pressure performance.
-    
-    Identifies most reliable players for high-pressure situations.
+@api_router.post("/ml/pressure/analyze-player")
+async def analyze_player_pressure(request: MLAnalysisRequest):
     """
-    if not request.clan_tag:
-        raise HTTPException(status_code=400, detail="clan_tag required")
-    
-    clan_tag = request.clan_tag
+    Analyze individual player performance under pressure.
     
-    # Get all attacks for clan
-    attacks = await db.war_attacks.find({"clan_tag": clan_tag}).to_list(10000)
+    Returns:
+    - Baseline performance metrics
+    - Pressure sensitivity coefficient
+    - Choking probability
+    - Reliability score
+    - Player archetype
     
-    if not attacks:
-        raise HTTPException(status_code=404, detail="No attack data found")
+    Educational: Demonstrates variance modeling and contextual performance analysis.
+    """
+    if not request.player_tag:
+        raise HTTPException(status_code=400, detail="player_tag required")
     
-    # Group by player
+    return await _player_pressure_impl(request.player_tag)
+
+@memoize_analysis("pressure_clan")
+async def _clan_pressure_impl(clan_tag: str) -> Dict[str, Any]:
+    """Clan-wide pressure report."""
+    # Stream the clan's attacks, grouping by player and by war as they arrive
     player_attacks = {}
-    for attack in attacks:
+    attacks_by_war = defaultdict(list)
+    cursor = db.war_attacks.find({"clan_tag": clan_tag}, PRESSURE_ATTACK_FIELDS).limit(10000)
+    async for attack in cursor:
         tag = attack['attacker_tag']
         if tag not in player_attacks:
             player_attacks[tag] = []
         player_attacks[tag].append(attack)
+        attacks_by_war[attack['war_id']].append(attack)
+    
+    if not player_attacks:
+        raise HTTPException(status_code=404, detail="No attack data found")
     
     # War contexts
-    war_ids = list(set(a['war_id'] for a in attacks))
     war_contexts = []
-    for war_id in war_ids:
-        war_attacks = [a for a in attacks if a['war_id'] == war_id]
+    for war_id, war_attacks in attacks_by_war.items():
         context = {
             'war_id': war_id,
             'our_stars': sum(a['stars'] for a in war_attacks),
@@ -410,16 +665,45 @@ async def analyze_clan_pressure(request: MLAnalysisRequest):
         war_contexts.append(context)
     
     # Run ML model
-    model = ml_models['pressure']
-    results = model.generate_clan_report(player_attacks, war_contexts)
+    model = PRESSURE_MODEL
+    results = await run_model(model.generate_clan_report, player_attacks, war_contexts)
     
     return results
 
+@api_router.post("/ml/pressure/analyze-clan")
+async def analyze_clan_pressure(request: MLAnalysisRequest):
+    """
+    Analyze clan-wide pressure performance.
+    
+    Identifies most reliable players for high-pressure situations.
+    """
+    if not request.clan_tag:
+        raise HTTPException(status_code=400, detail="clan_tag required")
+    
+    return await _clan_pressure_impl(request.clan_tag)
+
 
 # ============================================================================
 # ML MODULE 3: COORDINATION
 # ============================================================================
 
+@memoize_analysis("coordination_war")
+async def _war_coordination_impl(war_id: str) -> Dict[str, Any]:
+    """Coordination report for one war."""
+    # Get attacks for this war
+    attacks = await db.war_attacks.find({"war_id": war_id}, COORDINATION_ATTACK_FIELDS).to_list(1000)
+    
+    if not attacks:
+        raise HTTPException(status_code=404, detail="No attacks found for this war")
+    
+    war_size = 15  # Default, could be derived from attacks
+    
+    # Run ML model
+    model = COORDINATION_MODEL
+    results = await run_model(model.generate_war_report, war_id, attacks, war_size)
+    
+    return results
+
 @api_router.post("/ml/coordination/analyze-war")
 async def analyze_war_coordination(request: MLAnalysisRequest):
     """
@@ -436,49 +720,73 @@ async def analyze_war_coordination(request: MLAnalysisRequest):
     if not request.war_id:
         raise HTTPException(status_code=400, detail="war_id required")
     
-    war_id = request.war_id
-    
-    # Get attacks for this war
-    attacks = await db.war_attacks.find({"war_id": war_id}).to_list(1000)
-    
-    if not attacks:
-        raise HTTPException(status_code=404, detail="No attacks found for this war")
-    
-    war_size = 15  # Default, could be derived from attacks
-    
-    # Run ML model
-    model = ml_models['coordination']
-    results = model.generate_war_report(war_id, attacks, war_size)
-    
-    return results
+    return await _war_coordination_impl(request.war_id)
 
-@api_router.post("/ml/coordination/analyze-clan-trend")
-async def analyze_clan_coordination_trend(request: MLAnalysisRequest):
-    """
-    Analyze coordination trends across multiple wars.
-    """
-    if not request.clan_tag:
-        raise HTTPException(status_code=400, detail="clan_tag required")
-    
-    clan_tag = request.clan_tag
-    
-    # Get recent wars
-    wars = await db.wars_history.find({"clan_tag": clan_tag}).sort("end_time", -1).limit(20).to_list(20)
+@memoize_analysis("coordination_trend")
+async def _coordination_trend_impl(clan_tag: str) -> Dict[str, Any]:
+    """Coordination trend over a clan's recent wars."""
+    # Get the recent wars joined with their stored report and their attacks
+    # in one aggregation. The joins run inside Mongo on the war_id indexes;
+    # attacks (trimmed to the fields the model reads) only come back for
+    # wars that have no stored report yet.
+    attack_fields = {field: f"$$attack.{field}" for field in COORDINATION_ATTACK_FIELDS if field != "_id"}
+    pipeline = [
+        {"$match": {"clan_tag": clan_tag}},
+        {"$sort": {"end_time": -1}},
+        {"$limit": 20},
+        {"$addFields": {"war_id": {"$concat": ["$clan_tag", "_", "$end_time"]}}},
+        {"$lookup": {
+            "from": "war_reports",
+            "localField": "war_id",
+            "foreignField": "war_id",
+            "as": "stored"
+        }},
+        {"$lookup": {
+            "from": "war_attacks",
+            "localField": "war_id",
+            "foreignField": "war_id",
+            "as": "attacks"
+        }},
+        {"$project": {
+            "_id": 0, "war_id": 1, "team_size": 1,
+            "report": {"$arrayElemAt": ["$stored.report", 0]},
+            "attacks": {"$cond": [
+                {"$gt": [{"$size": "$stored"}, 0]},
+                [],
+                {"$map": {"input": "$attacks", "as": "attack", "in": attack_fields}}
+            ]}
+        }}
+    ]
+    wars = await db.wars_history.aggregate(pipeline).to_list(20)
     
     if len(wars) < 3:
         raise HTTPException(status_code=404, detail="Insufficient war history (need at least 3 wars)")
     
-    # Analyze each war
-    war_reports = []
-    model = ml_models['coordination']
+    # Analyze the wars without a stored report (in parallel across the ML
+    # workers) and persist them: wars in the log are closed, so their
+    # reports never change
+    model = COORDINATION_MODEL
+    pending = [war for war in wars if 'report' not in war and war['attacks']]
+    computed = await asyncio.gather(*(
+        run_model(model.generate_war_report, war['war_id'], war['attacks'], war['team_size'])
+        for war in pending
+    ))
+    if computed:
+        now = datetime.utcnow()
+        try:
+            await db.war_reports.insert_many(
+                [{"war_id": war['war_id'], "computed_at": now, "report": report}
+                 for war, report in zip(pending, computed)],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            # A concurrent request stored some of these first (unique war_id)
+            if any(err.get('code') != 11000 for err in e.details.get('writeErrors', [])):
+                raise
+        for war, report in zip(pending, computed):
+            war['report'] = report
     
-    for war in wars:
-        war_id = f"{clan_tag}_{war['end_time']}"
-        attacks = await db.war_attacks.find({"war_id": war_id}).to_list(1000)
-        
-        if attacks:
-            report = model.generate_war_report(war_id, attacks, war['team_size'])
-            war_reports.append(report)
+    war_reports = [war['report'] for war in wars if 'report' in war]
     
     # Generate trend analysis
     trend = model.generate_clan_coordination_trend(war_reports)
@@ -489,11 +797,41 @@ async def analyze_clan_coordination_trend(request: MLAnalysisRequest):
         "recent_wars": war_reports[:5]
     }
 
+@api_router.post("/ml/coordination/analyze-clan-trend")
+async def analyze_clan_coordination_trend(request: MLAnalysisRequest):
+    """
+    Analyze coordination trends across multiple wars.
+    """
+    if not request.clan_tag:
+        raise HTTPException(status_code=400, detail="clan_tag required")
+    
+    return await _coordination_trend_impl(request.clan_tag)
+
 
 # ============================================================================
 # ML MODULE 4: TROPHY VOLATILITY
 # ============================================================================
 
+@memoize_analysis("volatility")
+async def _volatility_impl(player_tag: str) -> Dict[str, Any]:
+    """Trophy volatility report for one player."""
+    # Fetch player snapshots
+    snapshots = await db.players_history.find(
+        {"player_tag": player_tag}, VOLATILITY_PLAYER_FIELDS
+    ).sort("snapshot_time", 1).to_list(1000)
+    
+    if len(snapshots) < 10:
+        raise HTTPException(status_code=404, detail="Insufficient data (need at least 10 snapshots)")
+    
+    # Convert to columns once (the query already returns them in time order)
+    series = TrophySeries.from_snapshots(snapshots, presorted=True)
+    
+    # Run ML model
+    model = VOLATILITY_MODEL
+    results = await run_model(model.generate_player_report, player_tag, series)
+    
+    return results
+
 @api_router.post("/ml/volatility/analyze")
 async def analyze_trophy_volatility(request: MLAnalysisRequest):
     """
@@ -511,25 +849,30 @@ async def analyze_trophy_volatility(request: MLAnalysisRequest):
     if not request.player_tag:
         raise HTTPException(status_code=400, detail="player_tag required")
     
-    player_tag = request.player_tag
-    
-    # Fetch player snapshots
-    snapshots = await db.players_history.find({"player_tag": player_tag}).sort("snapshot_time", 1).to_list(1000)
-    
-    if len(snapshots) < 10:
-        raise HTTPException(status_code=404, detail="Insufficient data (need at least 10 snapshots)")
-    
-    # Run ML model
-    model = ml_models['volatility']
-    results = model.generate_player_report(player_tag, snapshots)
-    
-    return results
+    return await _volatility_impl(request.player_tag)
 
 
 # ============================================================================
 # ML MODULE 5: DONATION NETWORK
 # ============================================================================
 
+@memoize_analysis("donations")
+async def _donation_impl(clan_tag: str) -> Dict[str, Any]:
+    """Donation network report for a clan."""
+    # Fetch player snapshots
+    player_snapshots = await fetch_clan_player_snapshots(clan_tag)
+    
+    if not player_snapshots:
+        raise HTTPException(status_code=404, detail="No player data found")
+    
+    player_snapshots = [normalize_snapshot(snap) for snap in player_snapshots]
+    
+    # Run ML model (the query already limited snapshots to this clan)
+    model = DONATIONS_MODEL
+    results = await run_model(model.generate_clan_report, player_snapshots, clan_tag, prefiltered=True)
+    
+    return results
+
 @api_router.post("/ml/donations/analyze")
 async def analyze_donation_network(request: MLAnalysisRequest):
     """
@@ -547,25 +890,33 @@ async def analyze_donation_network(request: MLAnalysisRequest):
     if not request.clan_tag:
         raise HTTPException(status_code=400, detail="clan_tag required")
     
-    clan_tag = request.clan_tag
-    
-    # Fetch player snapshots
-    player_snapshots = await db.players_history.find({"clan_tag": clan_tag}).to_list(10000)
-    
-    if not player_snapshots:
-        raise HTTPException(status_code=404, detail="No player data found")
-    
-    # Run ML model
-    model = ml_models['donations']
-    results = model.generate_clan_report(player_snapshots, clan_tag)
-    
-    return results
+    return await _donation_impl(request.clan_tag)
 
 
 # ============================================================================
 # ML MODULE 6: CLAN CAPITAL
 # ============================================================================
 
+@memoize_analysis("capital")
+async def _capital_impl(clan_tag: str) -> Dict[str, Any]:
+    """Clan capital report for a clan."""
+    # Fetch capital raid data
+    raids = await cached_find(
+        f"cr:{clan_tag}", clan_tag,
+        lambda: db.capital_raids_history.find(
+            {"clan_tag": clan_tag}, CAPITAL_RAID_FIELDS
+        ).sort("start_time", -1).to_list(50)
+    )
+    
+    if not raids:
+        raise HTTPException(status_code=404, detail="No capital raid data found")
+    
+    # Run ML model
+    model = CAPITAL_MODEL
+    results = await run_model(model.generate_clan_report, raids)
+    
+    return results
+
 @api_router.post("/ml/capital/analyze")
 async def analyze_capital_investment(request: MLAnalysisRequest):
     """
@@ -583,25 +934,63 @@ async def analyze_capital_investment(request: MLAnalysisRequest):
     if not request.clan_tag:
         raise HTTPException(status_code=400, detail="clan_tag required")
     
-    clan_tag = request.clan_tag
+    return await _capital_impl(request.clan_tag)
+
+
+# ============================================================================
+# ML MODULE 7: MATCHMAKING FAIRNESS
+# ============================================================================
+
+@memoize_analysis("fairness")
+async def _fairness_impl(clan_tag: str, force_refresh: bool = False) -> Dict[str, Any]:
+    """Matchmaking fairness audit for a clan (24h Mongo cache unless force_refresh)."""
+    now = datetime.utcnow()
     
-    # Fetch capital raid data
-    raids = await db.capital_raids_history.find({"clan_tag": clan_tag}).sort("start_time", -1).to_list(50)
+    # Check cache unless force refresh
+    if not force_refresh:
+        cached = await db.ml_results.find_one({
+            "model_name": "matchmaking_fairness",
+            "entity_id": clan_tag,
+            "valid_until": {"$gt": now}
+        })
+        if cached:
+            return cached['results']
     
-    if not raids:
-        raise HTTPException(status_code=404, detail="No capital raid data found")
+    # Fetch war history and the latest clan snapshot (independent queries,
+    # run concurrently); clan characteristics come from that snapshot only
+    wars, latest_clan = await asyncio.gather(
+        cached_find(
+            f"wh:{clan_tag}", clan_tag,
+            lambda: db.wars_history.find({"clan_tag": clan_tag}, FAIRNESS_WAR_FIELDS).to_list(1000)
+        ),
+        db.clans_history.find_one(
+            {"clan_tag": clan_tag},
+            FAIRNESS_CLAN_FIELDS,
+            sort=[("snapshot_time", -1)]
+        )
+    )
+    clan_snapshots = [latest_clan] if latest_clan is not None else []
+    
+    if len(wars) < 10:
+        raise HTTPException(status_code=404, detail="Insufficient war history (need at least 10 wars)")
     
     # Run ML model
-    model = ml_models['capital']
-    results = model.generate_clan_report(raids)
+    model = FAIRNESS_MODEL
+    results = await run_model(model.generate_fairness_report, wars, clan_snapshots, timestamp=now.isoformat())
+    
+    # Cache results for 24 hours
+    await db.ml_results.insert_one({
+        "model_name": "matchmaking_fairness",
+        "entity_type": "clan",
+        "entity_id": clan_tag,
+        "computed_at": now,
+        "valid_until": now + timedelta(hours=24),
+        "results": results,
+        "data_points_used": len(wars)
+    })
     
     return results
 
-
-# ============================================================================
-# ML MODULE 7: MATCHMAKING FAIRNESS
-# ============================================================================
-
 @api_router.post("/ml/fairness/audit")
 async def audit_matchmaking_fairness(request: MLAnalysisRequest):
     """
@@ -619,20 +1008,7 @@ async def audit_matchmaking_fairness(request: MLAnalysisRequest):
     if not request.clan_tag:
         raise HTTPException(status_code=400, detail="clan_tag required")
     
-    clan_tag = request.clan_tag
-    
-    # Fetch war history
-    wars = await db.wars_history.find({"clan_tag": clan_tag}).to_list(1000)
-    clan_snapshots = await db.clans_history.find({"clan_tag": clan_tag}).to_list(1000)
-    
-    if len(wars) < 10:
-        raise HTTPException(status_code=404, detail="Insufficient war history (need at least 10 wars)")
-    
-    # Run ML model
-    model = ml_models['fairness']
-    results = model.generate_fairness_report(wars, clan_snapshots)
-    
-    return results
+    return await _fairness_impl(request.clan_tag, force_refresh=request.force_refresh)
 
 
 # ============================================================================
@@ -640,18 +1016,58 @@ async def audit_matchmaking_fairness(request: MLAnalysisRequest):
 # ============================================================================
 
 @api_router.get("/ml/dashboard/{clan_tag}")
-async def get_clan_ml_dashboard(clan_tag: str):
+async def get_clan_ml_dashboard(clan_tag: str, request: Request, response: Response):
     """
     Get comprehensive ML analysis dashboard for a clan.
     
-    Runs all applicable ML models and returns unified view.
+    Runs all applicable ML models and returns unified view. Dashboards whose
+    analyses all succeeded carry an ETag derived from the clan's data
+    counts; a matching If-None-Match gets a 304 without running any
+    analysis. Dashboards holding an analysis error get no ETag, so a
+    transient failure is never revalidated as current.
     
     Educational: Shows how to compose multiple ML modules into application.
     """
-    clan_tag = clan_tag.replace('%23', '#')
+    # Decode any percent-escapes left in the tag (e.g. a double-encoded %2523)
+    clan_tag = unquote(clan_tag)
     
     # Check data availability first
     stats = await get_clan_data_stats(clan_tag)
+    
+    etag = _dashboard_etag(clan_tag, stats)
+    if _etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    # Auto-refreshing clients often ask for the same clan at once; let them
+    # share one fan-out
+    dashboard = await coalesce(("dashboard", clan_tag), lambda: _build_clan_dashboard(clan_tag, stats))
+    if not any('error' in analysis for analysis in dashboard['analyses'].values()):
+        response.headers["ETag"] = etag
+    return dashboard
+
+
+def _dashboard_etag(clan_tag: str, stats: Dict[str, Any]) -> str:
+    """
+    Weak ETag of a clan's dashboard.
+    
+    Every collection pass changes the document counts, so they identify the
+    data the analyses ran on (generated_at and report timestamps still
+    differ between builds, hence weak).
+    """
+    counts = json.dumps(stats['data_availability'], sort_keys=True)
+    return 'W/"' + hashlib.md5(f"{clan_tag}:{counts}".encode()).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value covers `etag`."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags
+
+
+async def _build_clan_dashboard(clan_tag: str, stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Run every analysis whose data is ready."""
     readiness = stats['ml_readiness']
     
     dashboard = {
@@ -661,40 +1077,75 @@ async def get_clan_ml_dashboard(clan_tag: str):
         "analyses": {}
     }
     
-    # Run each analysis if data is ready
-    try:
-        if readiness['leadership_analysis']:
-            dashboard['analyses']['leadership'] = await analyze_leadership(
-                MLAnalysisRequest(clan_tag=clan_tag)
-            )
-    except Exception as e:
-        dashboard['analyses']['leadership'] = {"error": str(e)}
+    # Run each analysis whose data is ready, concurrently
+    # (calling the analysis impls directly, not the HTTP handlers)
+    analyses = [
+        ('leadership', 'leadership_analysis', _leadership_impl),
+        ('donations', 'donation_analysis', _donation_impl),
+        ('capital', 'capital_analysis', _capital_impl),
+        ('fairness', 'fairness_analysis', _fairness_impl)
+    ]
+    names = [name for name, ready_key, _ in analyses if readiness[ready_key]]
+    results = await asyncio.gather(
+        *(impl(clan_tag) for _, ready_key, impl in analyses if readiness[ready_key]),
+        return_exceptions=True
+    )
     
-    try:
-        if readiness['donation_analysis']:
-            dashboard['analyses']['donations'] = await analyze_donation_network(
-                MLAnalysisRequest(clan_tag=clan_tag)
-            )
-    except Exception as e:
-        dashboard['analyses']['donations'] = {"error": str(e)}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            dashboard['analyses'][name] = {"error": str(result)}
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            dashboard['analyses'][name] = result
     
-    try:
-        if readiness['capital_analysis']:
-            dashboard['analyses']['capital'] = await analyze_capital_investment(
-                MLAnalysisRequest(clan_tag=clan_tag)
-            )
-    except Exception as e:
-        dashboard['analyses']['capital'] = {"error": str(e)}
+    return dashboard
+
+
+# Clan analyses that can be requested together through /ml/analyze
+BATCH_ANALYSES = {
+    'leadership': _leadership_impl,
+    'donations': _donation_impl,
+    'capital': _capital_impl,
+    'fairness': _fairness_impl
+}
+
+@api_router.post("/ml/analyze")
+async def analyze_clan_batch(request: MLBatchAnalysisRequest):
+    """
+    Run several clan analyses in one request.
     
-    try:
-        if readiness['fairness_analysis']:
-            dashboard['analyses']['fairness'] = await audit_matchmaking_fairness(
-                MLAnalysisRequest(clan_tag=clan_tag)
-            )
-    except Exception as e:
-        dashboard['analyses']['fairness'] = {"error": str(e)}
+    Returns one entry per requested kind: the analysis report, or
+    {"error", "status_code"} when that analysis could not run (e.g. 404 for
+    missing data). Analyses run concurrently and share the clan's snapshot
+    fetch, so a client needing several pays one round-trip.
+    """
+    unknown = [kind for kind in request.kinds if kind not in BATCH_ANALYSES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown analysis kinds: {', '.join(unknown)} (expected any of {', '.join(BATCH_ANALYSES)})"
+        )
+    
+    kinds = list(dict.fromkeys(request.kinds))
+    results = await asyncio.gather(
+        *(BATCH_ANALYSES[kind](request.clan_tag) for kind in kinds),
+        return_exceptions=True
+    )
     
-    return dashboard
+    analyses = {}
+    for kind, result in zip(kinds, results):
+        if isinstance(result, HTTPException):
+            analyses[kind] = {"error": result.detail, "status_code": result.status_code}
+        elif isinstance(result, Exception):
+            logger.error(f"{kind} analysis failed for {request.clan_tag}: {result}")
+            analyses[kind] = {"error": str(result), "status_code": 500}
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            analyses[kind] = result
+    
+    return analyses
 
 
 # ============================================================================
@@ -759,12 +1210,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def ensure_indexes():
+    """
+    Create the indexes backing the hot find/count_documents paths.
+    
+    Compound keys follow equality-then-sort order; their clan_tag prefix
+    also serves the plain clan_tag lookups and counts. create_index is a
+    no-op for indexes that already exist.
+    """
+    await asyncio.gather(
+        db.players_history.create_index([("clan_tag", 1), ("snapshot_time", -1)]),
+        db.players_history.create_index([("player_tag", 1), ("snapshot_time", 1)]),
+        db.clans_history.create_index([("clan_tag", 1), ("snapshot_time", -1)]),
+        db.wars_history.create_index([("clan_tag", 1), ("end_time", -1)]),
+        db.war_attacks.create_index([("clan_tag", 1), ("attack_time", 1)]),
+        db.war_attacks.create_index([("attacker_tag", 1)]),
+        db.war_attacks.create_index([("war_id", 1)]),
+        db.war_reports.create_index([("war_id", 1)], unique=True),
+        db.capital_raids_history.create_index([("clan_tag", 1), ("start_time", -1)]),
+        db.ml_results.create_index([("model_name", 1), ("entity_id", 1), ("valid_until", -1)])
+    )
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    """Initialize background data collection."""
+    """Create Mongo indexes, start the ML worker pool and background data collection."""
+    global ml_executor
     logger.info("Starting CoC ML Research Platform...")
     
+    if ML_WORKERS > 0:
+        # Workers must not inherit the Motor client or Numba's threads, so
+        # never fork; forkserver is unavailable on Windows, spawn works anywhere
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        try:
+            ml_executor = ProcessPoolExecutor(
+                max_workers=ML_WORKERS,
+                mp_context=multiprocessing.get_context(start_method),
+            )
+            logger.info(f"ML process pool started ({ML_WORKERS} workers, {start_method})")
+        except Exception as e:
+            ml_executor = None
+            logger.error(f"Error starting ML process pool, running models inline: {e}")
+    
+    try:
+        await ensure_indexes()
+        logger.info("MongoDB indexes ensured")
+    except Exception as e:
+        logger.error(f"Error creating MongoDB indexes: {e}")
+    
     if data_collector:
         # Start data collection scheduler in background
         asyncio.create_task(data_collector.start_scheduler(interval_hours=6))
@@ -778,6 +1271,8 @@ async def startup_event():
 async def shutdown_db_client():
     """Clean shutdown."""
     client.close()
+    if ml_executor is not None:
+        ml_executor.shutdown(cancel_futures=True)
     if coc_client:
         await coc_client.close()
     logger.info("Server shutdown complete")
@@ -14,44 +14,55 @@ import sys
 BACKEND_URL = "https://zero-hassle-ml.preview.emergentagent.com"
 
 class BackendTester:
+    """Runs the endpoint checks over one shared HTTP session (use as `async with`)."""
+    
     def __init__(self, base_url):
         self.base_url = base_url
         self.results = []
+        self._session = None
+    
+    async def __aenter__(self):
+        # One session for all tests so requests reuse keep-alive connections
+        self._session = aiohttp.ClientSession()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
         
     async def test_endpoint(self, method, endpoint, expected_status=200, description=""):
         """Test a single API endpoint"""
         url = f"{self.base_url}{endpoint}"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.request(method, url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    status = response.status
-                    try:
-                        data = await response.json()
-                    except:
-                        data = await response.text()
-                    
-                    success = status == expected_status
-                    
-                    result = {
-                        "endpoint": endpoint,
-                        "method": method,
-                        "url": url,
-                        "status_code": status,
-                        "expected_status": expected_status,
-                        "success": success,
-                        "response_data": data,
-                        "description": description,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    self.results.append(result)
-                    
-                    print(f"{'✅' if success else '❌'} {method} {endpoint} - Status: {status} (Expected: {expected_status})")
-                    if not success:
-                        print(f"   Response: {data}")
-                    
-                    return result
+            async with self._session.request(method, url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                status = response.status
+                try:
+                    data = await response.json()
+                except:
+                    data = await response.text()
+                
+                success = status == expected_status
+                
+                result = {
+                    "endpoint": endpoint,
+                    "method": method,
+                    "url": url,
+                    "status_code": status,
+                    "expected_status": expected_status,
+                    "success": success,
+                    "response_data": data,
+                    "description": description,
+                    "timestamp": datetime.now().isoformat()
+                }
+                
+                self.results.append(result)
+                
+                print(f"{'✅' if success else '❌'} {method} {endpoint} - Status: {status} (Expected: {expected_status})")
+                if not success:
+                    print(f"   Response: {data}")
+                
+                return result
                     
         except Exception as e:
             result = {
@@ -75,49 +86,48 @@ class BackendTester:
         url = f"{self.base_url}{endpoint}"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url, 
-                    json=payload,
-                    headers={'Content-Type': 'application/json'},
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    status = response.status
-                    try:
-                        data = await response.json()
-                    except:
-                        data = await response.text()
-                    
-                    success = status == expected_status
-                    
-                    result = {
-                        "endpoint": endpoint,
-                        "method": "POST",
-                        "url": url,
-                        "payload": payload,
-                        "status_code": status,
-                        "expected_status": expected_status,
-                        "success": success,
-                        "response_data": data,
-                        "description": description,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    self.results.append(result)
-                    
-                    print(f"{'✅' if success else '❌'} POST {endpoint} - Status: {status} (Expected: {expected_status})")
-                    if not success:
-                        print(f"   Response: {data}")
-                    elif isinstance(data, dict):
-                        # Print key response fields for successful ML analysis
-                        if 'leadership_entropy' in data:
-                            print(f"   ✓ Leadership analysis returned entropy data")
-                        if 'network_stats' in data:
-                            print(f"   ✓ Donation analysis returned network stats")
-                        if 'contribution_analysis' in data:
-                            print(f"   ✓ Capital analysis returned contribution data")
-                    
-                    return result
+            async with self._session.post(
+                url, 
+                json=payload,
+                headers={'Content-Type': 'application/json'},
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                status = response.status
+                try:
+                    data = await response.json()
+                except:
+                    data = await response.text()
+                
+                success = status == expected_status
+                
+                result = {
+                    "endpoint": endpoint,
+                    "method": "POST",
+                    "url": url,
+                    "payload": payload,
+                    "status_code": status,
+                    "expected_status": expected_status,
+                    "success": success,
+                    "response_data": data,
+                    "description": description,
+                    "timestamp": datetime.now().isoformat()
+                }
+                
+                self.results.append(result)
+                
+                print(f"{'✅' if success else '❌'} POST {endpoint} - Status: {status} (Expected: {expected_status})")
+                if not success:
+                    print(f"   Response: {data}")
+                elif isinstance(data, dict):
+                    # Print key response fields for successful ML analysis
+                    if 'leadership_entropy' in data:
+                        print(f"   ✓ Leadership analysis returned entropy data")
+                    if 'network_stats' in data:
+                        print(f"   ✓ Donation analysis returned network stats")
+                    if 'contribution_analysis' in data:
+                        print(f"   ✓ Capital analysis returned contribution data")
+                
+                return result
                     
         except Exception as e:
             result = {
@@ -143,28 +153,31 @@ class BackendTester:
         print(f"📍 Backend URL: {self.base_url}")
         print("=" * 60)
         
-        # Test 1: Root API endpoint
-        await self.test_endpoint(
-            "GET", 
-            "/api/", 
-            200, 
-            "Root API endpoint - should return platform info and available modules"
-        )
-        
-        # Test 2: System IP endpoint  
-        await self.test_endpoint(
-            "GET", 
-            "/api/system/ip", 
-            200, 
-            "System IP endpoint - should return current system IP address"
-        )
-        
-        # Test 3: Data clans listing
-        await self.test_endpoint(
-            "GET", 
-            "/api/data/clans", 
-            200, 
-            "Data clans endpoint - should return list of tracked clans"
+        # Independent checks, run concurrently (output order varies)
+        await asyncio.gather(
+            # Test 1: Root API endpoint
+            self.test_endpoint(
+                "GET", 
+                "/api/", 
+                200, 
+                "Root API endpoint - should return platform info and available modules"
+            ),
+            
+            # Test 2: System IP endpoint  
+            self.test_endpoint(
+                "GET", 
+                "/api/system/ip", 
+                200, 
+                "System IP endpoint - should return current system IP address"
+            ),
+            
+            # Test 3: Data clans listing
+            self.test_endpoint(
+                "GET", 
+                "/api/data/clans", 
+                200, 
+                "Data clans endpoint - should return list of tracked clans"
+            )
         )
         
         print("=" * 60)
@@ -178,44 +191,47 @@ class BackendTester:
         print(f"👤 Player: #U8YQR92L (Anirban)")
         print("=" * 60)
         
-        # Test 1: Player Search - Anirban from Amber Amry
-        await self.test_endpoint(
-            "GET", 
-            "/api/player/%23U8YQR92L", 
-            200, 
-            "Player search for Anirban (#U8YQR92L) - should return player from Amber Amry clan"
-        )
-        
-        # Test 2: Clan Stats - Amber Amry data availability
-        await self.test_endpoint(
-            "GET", 
-            "/api/data/clan/%239PC99CP8/stats", 
-            200, 
-            "Clan stats for Amber Amry (#9PC99CP8) - should show collected data (player_snapshots > 0, capital_raids > 0)"
-        )
-        
-        # Test 3: Leadership Analysis
-        await self.test_post_endpoint(
-            "/api/ml/leadership/analyze",
-            {"clan_tag": "#9PC99CP8"},
-            200,
-            "Leadership analysis for Amber Amry - should return leadership_entropy and top_leaders"
-        )
-        
-        # Test 4: Donation Analysis  
-        await self.test_post_endpoint(
-            "/api/ml/donations/analyze",
-            {"clan_tag": "#9PC99CP8"},
-            200,
-            "Donation analysis for Amber Amry - should return network_stats and top_contributors"
-        )
-        
-        # Test 5: Capital Analysis
-        await self.test_post_endpoint(
-            "/api/ml/capital/analyze", 
-            {"clan_tag": "#9PC99CP8"},
-            200,
-            "Capital analysis for Amber Amry - should return contribution_analysis with player profiles"
+        # Independent checks, run concurrently (output order varies)
+        await asyncio.gather(
+            # Test 1: Player Search - Anirban from Amber Amry
+            self.test_endpoint(
+                "GET", 
+                "/api/player/%23U8YQR92L", 
+                200, 
+                "Player search for Anirban (#U8YQR92L) - should return player from Amber Amry clan"
+            ),
+            
+            # Test 2: Clan Stats - Amber Amry data availability
+            self.test_endpoint(
+                "GET", 
+                "/api/data/clan/%239PC99CP8/stats", 
+                200, 
+                "Clan stats for Amber Amry (#9PC99CP8) - should show collected data (player_snapshots > 0, capital_raids > 0)"
+            ),
+            
+            # Test 3: Leadership Analysis
+            self.test_post_endpoint(
+                "/api/ml/leadership/analyze",
+                {"clan_tag": "#9PC99CP8"},
+                200,
+                "Leadership analysis for Amber Amry - should return leadership_entropy and top_leaders"
+            ),
+            
+            # Test 4: Donation Analysis  
+            self.test_post_endpoint(
+                "/api/ml/donations/analyze",
+                {"clan_tag": "#9PC99CP8"},
+                200,
+                "Donation analysis for Amber Amry - should return network_stats and top_contributors"
+            ),
+            
+            # Test 5: Capital Analysis
+            self.test_post_endpoint(
+                "/api/ml/capital/analyze", 
+                {"clan_tag": "#9PC99CP8"},
+                200,
+                "Capital analysis for Amber Amry - should return contribution_analysis with player profiles"
+            )
         )
         
         print("=" * 60)
@@ -245,15 +261,14 @@ class BackendTester:
 
 async def main():
     """Main test runner"""
-    tester = BackendTester(BACKEND_URL)
-    
     try:
-        # Run the real data tests as requested in the review
-        results = await tester.run_real_data_tests()
-        tester.print_summary()
-        
-        # Return results for further processing
-        return results
+        async with BackendTester(BACKEND_URL) as tester:
+            # Run the real data tests as requested in the review
+            results = await tester.run_real_data_tests()
+            tester.print_summary()
+            
+            # Return results for further processing
+            return results
         
     except Exception as e:
         print(f"❌ Test execution failed: {str(e)}")
@@ -4,109 +4,353 @@ Detailed Backend API Testing for CoC ML Research Platform
 Examines response data quality and content validation.
 """
 
+import argparse
 import asyncio
 import aiohttp
+import hashlib
 import json
-from datetime import datetime
+import sys
+import time
+from urllib.parse import quote
+
+from yarl import URL
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # optional dependency
+    orjson = None
+    _loads = json.loads
+    _dumps = lambda obj: json.dumps(obj).encode()
+
+try:
+    import uvloop
+except ImportError:  # optional dependency (not on Windows), plain asyncio loop
+    uvloop = None
+
+try:
+    import diskcache
+except ImportError:  # optional dependency, reruns always hit the backend
+    diskcache = None
 
 BACKEND_URL = "https://zero-hassle-ml.preview.emergentagent.com"
 
+CLAN_TAG = "#9PC99CP8"
+PLAYER_TAG = "#U8YQR92L"
+CLAN = quote(CLAN_TAG, safe="")
+PLAYER = quote(PLAYER_TAG, safe="")
+
+# Every ML analysis request sends the same body, so serialize it once
+CLAN_BODY = _dumps({"clan_tag": CLAN_TAG})
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Built once and marked as already encoded so aiohttp skips re-parsing and
+# re-quoting the URL on every request
+ENDPOINTS = {
+    name: URL(f"{BACKEND_URL}{path}", encoded=True)
+    for name, path in {
+        "player": f"/api/player/{PLAYER}",
+        "stats": f"/api/data/clan/{CLAN}/stats",
+        "leadership": "/api/ml/leadership/analyze",
+        "donations": "/api/ml/donations/analyze",
+        "capital": "/api/ml/capital/analyze",
+        "analyze": "/api/ml/analyze",
+    }.items()
+}
+
+# Bound every request so a slow ML endpoint cannot stall the run, and retry
+# transient failures (connection errors, timeouts, 5xx) with backoff
+TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=5, sock_read=25)
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.3
+
+# On-disk cache of successful responses so repeated runs during development
+# skip the network round-trip (disable with --no-cache). Entries that came
+# with an ETag are kept longer and revalidated with If-None-Match once stale.
+CACHE_DIR = ".detailed_test_cache"
+CACHE_TTL_SECONDS = 300
+CACHE_REVALIDATE_SECONDS = 24 * 60 * 60
+response_cache = None
+
+async def read_json(response):
+    """Parse a response body straight from bytes (orjson when available)"""
+    return _loads(await response.read())
+
+async def cached_request(session, method, url, body=b"", keep=None, ttl=CACHE_TTL_SECONDS):
+    """
+    Return (status, data) for a request, served from the disk cache when fresh.
+    
+    `body` is an already serialized JSON payload (bytes). `keep` optionally
+    trims a successful response to the parts the summary reads, so large
+    reports are not held (or cached) in full for a few summary lines.
+    A stale entry with an ETag is revalidated, and reused if the backend
+    answers 304 Not Modified.
+    """
+    key = hashlib.blake2b(f"{method} {url} ".encode() + body).hexdigest()
+    entry = response_cache.get(key) if response_cache is not None else None
+    headers = dict(JSON_HEADERS) if body else {}
+    if entry is not None:
+        if time.time() - entry["stored_at"] < ttl:
+            return entry["result"]
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+    
+    async with session.request(method, url, data=body or None, headers=headers) as response:
+        if response.status == 304 and entry is not None:
+            result = entry["result"]
+            etag = response.headers.get("ETag", entry["etag"])
+        else:
+            try:
+                data = await read_json(response)
+            except ValueError:
+                if response.status < 400:
+                    raise
+                data = {}  # HTML error page rather than a JSON error body
+            if keep is not None and response.status == 200:
+                data = keep(data)
+            result = (response.status, data)
+            etag = response.headers.get("ETag")
+    
+    if response_cache is not None and result[0] == 200:
+        response_cache.set(
+            key,
+            {"result": result, "etag": etag, "stored_at": time.time()},
+            expire=CACHE_REVALIDATE_SECONDS if etag else ttl
+        )
+    return result
+
+def _trim(data, fields):
+    """Keep only the given top-level keys of a report"""
+    return {k: data[k] for k in fields if k in data}
+
+def _path(dotted):
+    return tuple(dotted.split("."))
+
+def _test(title, method, endpoint, lines, body=b"", top=None, kind=None, ready=None):
+    """
+    Build one TESTS entry.
+    
+    `lines` are (label, dotted path, default) summary fields. `top` is an
+    optional (list path, count label, item label, score label, score key)
+    summary of a ranked list: its length plus its first entry. Tests with a
+    `kind` are clan analyses, fetched together through /api/ml/analyze, and
+    skipped when the clan stats' `ready` flag for them is False.
+    """
+    # The summary block is rendered from a template built here once, filled
+    # by format_map with the values extracted from the response
+    template = f"{title}\n   Status: {{status}}\n" + "".join(
+        f"   {label}: {{f{i}}}\n" for i, (label, _, _) in enumerate(lines)
+    )
+    lines = [(f"f{i}", _path(path), default) for i, (_, path, default) in enumerate(lines)]
+    if top is not None:
+        list_path, count_label, item_label, score_label, score_key = top
+        top = (
+            _path(list_path),
+            score_key,
+            f"   {count_label}: {{count}}\n",
+            f"   {item_label}: {{name}} ({score_label}: {{score}})\n",
+        )
+    # Only the top-level keys the summary reads are kept from the response
+    fields = tuple(dict.fromkeys(
+        [path[0] for _, path, _ in lines] + ([top[0][0]] if top else [])
+    ))
+    return {
+        "title": title,
+        "template": template,
+        "method": method,
+        "url": ENDPOINTS[endpoint],
+        "body": body,
+        "fields": fields,
+        "lines": lines,
+        "top": top,
+        "kind": kind,
+        "ready": ready,
+    }
+
+TESTS = [
+    _test("1️⃣ PLAYER SEARCH TEST", "GET", "player", [
+        ("Player Name", "player.name", "N/A"),
+        ("Clan Name", "clan.name", "N/A"),
+        ("Clan Tag", "clan.tag", "N/A"),
+        ("Town Hall Level", "player.townHallLevel", "N/A"),
+        ("Trophies", "player.trophies", "N/A"),
+    ]),
+    _test("2️⃣ CLAN STATS TEST", "GET", "stats", [
+        ("Player Snapshots", "data_availability.player_snapshots", 0),
+        ("Clan Snapshots", "data_availability.clan_snapshots", 0),
+        ("Wars", "data_availability.wars", 0),
+        ("War Attacks", "data_availability.war_attacks", 0),
+        ("Capital Raids", "data_availability.capital_raids", 0),
+        ("Days of Data", "data_availability.days_of_data", 0),
+        ("ML Ready - Leadership", "ml_readiness.leadership_analysis", False),
+        ("ML Ready - Donations", "ml_readiness.donation_analysis", False),
+        ("ML Ready - Capital", "ml_readiness.capital_analysis", False),
+    ]),
+    _test("3️⃣ LEADERSHIP ANALYSIS TEST", "POST", "leadership", [
+        ("Leadership Entropy", "leadership_entropy", "N/A"),
+    ], body=CLAN_BODY,
+        top=("top_leaders", "Top Leaders Count", "Top Leader", "Score", "influence_score"),
+        kind="leadership", ready="leadership_analysis"),
+    _test("4️⃣ DONATION ANALYSIS TEST", "POST", "donations", [
+        ("Total Nodes", "network_stats.total_nodes", "N/A"),
+        ("Total Edges", "network_stats.total_edges", "N/A"),
+        ("Network Density", "network_stats.network_density", "N/A"),
+    ], body=CLAN_BODY,
+        top=("top_contributors", "Top Contributors Count", "Top Contributor", "Score", "centrality_score"),
+        kind="donations", ready="donation_analysis"),
+    _test("5️⃣ CAPITAL ANALYSIS TEST", "POST", "capital", [
+        ("Total Raids Analyzed", "contribution_analysis.total_raids", "N/A"),
+        ("Average Contribution", "contribution_analysis.avg_contribution_per_raid", "N/A"),
+    ], body=CLAN_BODY,
+        top=("contribution_analysis.player_profiles", "Player Profiles Count", "Top Contributor", "Avg", "avg_contribution"),
+        kind="capital", ready="capital_analysis"),
+]
+
+STATS_TEST = next(test for test in TESTS if test["url"] == ENDPOINTS["stats"])
+
+def dig(data, path, default):
+    """Follow `path` through nested dicts, falling back to `default` at the leaf"""
+    *parents, leaf = path
+    for key in parents:
+        data = data.get(key, {})
+    return data.get(leaf, default)
+
+async def with_retry(fn, *, tries=RETRY_ATTEMPTS, base=RETRY_BASE_DELAY):
+    """Await fn() for a (status, data) result, retrying transient failures"""
+    for attempt in range(tries):
+        last_try = attempt == tries - 1
+        try:
+            result = await fn()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            # ValueError: a truncated or non-JSON success body
+            if last_try:
+                raise
+        else:
+            if result[0] < 500 or last_try:
+                return result
+        await asyncio.sleep(base * 2 ** attempt)
+
+async def fetch(session, method, url, body=b"", keep=None):
+    """Retried cached_request(); a final failure is returned as an ERROR status"""
+    try:
+        return await with_retry(lambda: cached_request(session, method, url, body, keep=keep))
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        # Report the failure in place of a status instead of aborting the run
+        return f"ERROR ({type(e).__name__}: {e})", {}
+
+async def run(session, test):
+    """Issue one test request, returning (status, data)"""
+    fields = test["fields"]
+    return await fetch(session, test["method"], test["url"], test["body"],
+                       keep=lambda data: _trim(data, fields))
+
+async def run_batch(session, tests):
+    """
+    Fetch every analysis test in one /api/ml/analyze request.
+    
+    Returns one (status, data) per test, taking a failed analysis' own
+    status_code from its error entry. Against a backend without the batched
+    endpoint, falls back to one request per analysis.
+    """
+    if not tests:
+        return []
+    fields = {test["kind"]: test["fields"] for test in tests}
+    body = _dumps({"clan_tag": CLAN_TAG, "kinds": list(fields)})
+    
+    def keep(data):
+        return {
+            kind: entry if "error" in entry else _trim(entry, fields.get(kind, ()))
+            for kind, entry in data.items()
+        }
+    
+    status, data = await fetch(session, "POST", ENDPOINTS["analyze"], body, keep=keep)
+    if status in (404, 405):
+        return await asyncio.gather(*(run(session, test) for test in tests))
+    if status != 200:
+        return [(status, data)] * len(tests)
+    
+    results = []
+    for test in tests:
+        entry = data.get(test["kind"], {})
+        if "error" in entry:
+            results.append((entry.get("status_code", status), {"detail": entry["error"]}))
+        else:
+            results.append((status, entry))
+    return results
+
+def format_result(test, status, data):
+    """Render one test's summary block (status None: the test was skipped)"""
+    if status is None:
+        return f"{test['title']}\n   ⏭ SKIPPED (not ready)\n"
+    
+    values = {"status": status}
+    for name, path, default in test["lines"]:
+        values[name] = dig(data, path, default)
+    block = test["template"].format_map(values)
+    
+    if test["top"] is not None:
+        list_path, score_key, count_template, item_template = test["top"]
+        items = dig(data, list_path, [])
+        block += count_template.format_map({"count": len(items)})
+        if items:
+            top = items[0]
+            block += item_template.format_map({
+                "name": top.get('name', 'N/A'),
+                "score": top.get(score_key, 'N/A'),
+            })
+    return block
+
 async def detailed_test():
     """Run detailed tests and examine response data"""
     
     print("🔍 DETAILED RESPONSE ANALYSIS")
     print("=" * 60)
     
-    async with aiohttp.ClientSession() as session:
+    # Every test hits the same host: keep its connections alive for reuse
+    # and cache the DNS lookup instead of resolving per request
+    connector = aiohttp.TCPConnector(
+        limit=10,
+        limit_per_host=10,
+        keepalive_timeout=30,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True
+    )
+    async with aiohttp.ClientSession(connector=connector, timeout=TIMEOUT) as session:
+        # Issue the independent tests concurrently, then the clan analyses
+        # as one batched request; results are printed in a fixed order
+        single = [test for test in TESTS if test["kind"] is None]
+        batched = [test for test in TESTS if test["kind"] is not None]
+        results = dict(zip(
+            map(id, single), await asyncio.gather(*(run(session, test) for test in single))
+        ))
         
-        # Test 1: Player Search - Detailed Analysis
-        print("1️⃣ PLAYER SEARCH TEST")
-        async with session.get(f"{BACKEND_URL}/api/player/%23U8YQR92L") as response:
-            player_data = await response.json()
-            print(f"   Status: {response.status}")
-            print(f"   Player Name: {player_data.get('player', {}).get('name', 'N/A')}")
-            print(f"   Clan Name: {player_data.get('clan', {}).get('name', 'N/A')}")
-            print(f"   Clan Tag: {player_data.get('clan', {}).get('tag', 'N/A')}")
-            print(f"   Town Hall Level: {player_data.get('player', {}).get('townHallLevel', 'N/A')}")
-            print(f"   Trophies: {player_data.get('player', {}).get('trophies', 'N/A')}")
-        
-        print()
-        
-        # Test 2: Clan Stats - Data Availability
-        print("2️⃣ CLAN STATS TEST")
-        async with session.get(f"{BACKEND_URL}/api/data/clan/%239PC99CP8/stats") as response:
-            stats_data = await response.json()
-            print(f"   Status: {response.status}")
-            data_avail = stats_data.get('data_availability', {})
-            print(f"   Player Snapshots: {data_avail.get('player_snapshots', 0)}")
-            print(f"   Clan Snapshots: {data_avail.get('clan_snapshots', 0)}")
-            print(f"   Wars: {data_avail.get('wars', 0)}")
-            print(f"   War Attacks: {data_avail.get('war_attacks', 0)}")
-            print(f"   Capital Raids: {data_avail.get('capital_raids', 0)}")
-            print(f"   Days of Data: {data_avail.get('days_of_data', 0)}")
-            
-            ml_ready = stats_data.get('ml_readiness', {})
-            print(f"   ML Ready - Leadership: {ml_ready.get('leadership_analysis', False)}")
-            print(f"   ML Ready - Donations: {ml_ready.get('donation_analysis', False)}")
-            print(f"   ML Ready - Capital: {ml_ready.get('capital_analysis', False)}")
-        
-        print()
-        
-        # Test 3: Leadership Analysis
-        print("3️⃣ LEADERSHIP ANALYSIS TEST")
-        async with session.post(
-            f"{BACKEND_URL}/api/ml/leadership/analyze",
-            json={"clan_tag": "#9PC99CP8"}
-        ) as response:
-            leadership_data = await response.json()
-            print(f"   Status: {response.status}")
-            print(f"   Leadership Entropy: {leadership_data.get('leadership_entropy', 'N/A')}")
-            
-            top_leaders = leadership_data.get('top_leaders', [])
-            print(f"   Top Leaders Count: {len(top_leaders)}")
-            if top_leaders:
-                print(f"   Top Leader: {top_leaders[0].get('name', 'N/A')} (Score: {top_leaders[0].get('influence_score', 'N/A')})")
-        
-        print()
-        
-        # Test 4: Donation Analysis
-        print("4️⃣ DONATION ANALYSIS TEST")
-        async with session.post(
-            f"{BACKEND_URL}/api/ml/donations/analyze",
-            json={"clan_tag": "#9PC99CP8"}
-        ) as response:
-            donation_data = await response.json()
-            print(f"   Status: {response.status}")
-            
-            network_stats = donation_data.get('network_stats', {})
-            print(f"   Total Nodes: {network_stats.get('total_nodes', 'N/A')}")
-            print(f"   Total Edges: {network_stats.get('total_edges', 'N/A')}")
-            print(f"   Network Density: {network_stats.get('network_density', 'N/A')}")
-            
-            top_contributors = donation_data.get('top_contributors', [])
-            print(f"   Top Contributors Count: {len(top_contributors)}")
-            if top_contributors:
-                print(f"   Top Contributor: {top_contributors[0].get('name', 'N/A')} (Score: {top_contributors[0].get('centrality_score', 'N/A')})")
-        
-        print()
-        
-        # Test 5: Capital Analysis
-        print("5️⃣ CAPITAL ANALYSIS TEST")
-        async with session.post(
-            f"{BACKEND_URL}/api/ml/capital/analyze",
-            json={"clan_tag": "#9PC99CP8"}
-        ) as response:
-            capital_data = await response.json()
-            print(f"   Status: {response.status}")
-            
-            contrib_analysis = capital_data.get('contribution_analysis', {})
-            print(f"   Total Raids Analyzed: {contrib_analysis.get('total_raids', 'N/A')}")
-            print(f"   Average Contribution: {contrib_analysis.get('avg_contribution_per_raid', 'N/A')}")
-            
-            player_profiles = contrib_analysis.get('player_profiles', [])
-            print(f"   Player Profiles Count: {len(player_profiles)}")
-            if player_profiles:
-                print(f"   Top Contributor: {player_profiles[0].get('name', 'N/A')} (Avg: {player_profiles[0].get('avg_contribution', 'N/A')})")
+        # An analysis the clan stats report as not ready would only come back
+        # as an error, so skip it (all run if readiness is unknown)
+        stats_status, stats_data = results[id(STATS_TEST)]
+        ml_ready = stats_data.get("ml_readiness") if stats_status == 200 else None
+        ready = [
+            test for test in batched
+            if ml_ready is None or ml_ready.get(test["ready"], False)
+        ]
+        results.update(zip(map(id, ready), await run_batch(session, ready)))
+    
+    # Emit the whole report in one write rather than a syscall per line
+    sys.stdout.write("\n".join(
+        format_result(test, *results.get(id(test), (None, {}))) for test in TESTS
+    ))
 
 if __name__ == "__main__":
-    asyncio.run(detailed_test())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always query the backend, bypassing the response cache")
+    args = parser.parse_args()
+    
+    if diskcache is not None and not args.no_cache:
+        response_cache = diskcache.Cache(CACHE_DIR)
+    try:
+        # libuv-backed event loop when available; same API as asyncio.run
+        (uvloop.run if uvloop is not None else asyncio.run)(detailed_test())
+    finally:
+        if response_cache is not None:
+            response_cache.close()